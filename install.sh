@@ -37,14 +37,14 @@ install_system_deps() {
     
     case "$DISTRO" in
         arch|manjaro|endeavouros)
-            sudo pacman -S --needed python python-pip vlc ffmpeg python-gobject base-devel
+            sudo pacman -S --needed python python-pip vlc ffmpeg ffmpegthumbnailer python-gobject base-devel
             ;;
         fedora)
-            sudo dnf install -y python3 python3-pip vlc ffmpeg python3-gobject python3-devel gcc
+            sudo dnf install -y python3 python3-pip vlc ffmpeg ffmpegthumbnailer python3-gobject python3-devel gcc
             ;;
         ubuntu|debian|pop|linuxmint|zorin)
             sudo apt update
-            sudo apt install -y python3 python3-pip python3-venv vlc ffmpeg \
+            sudo apt install -y python3 python3-pip python3-venv vlc ffmpeg libffmpegthumbnailer4v5 \
                 libglib2.0-dev python3-gi python3-gi-cairo build-essential python3-dev
             ;;
         *)
@@ -83,6 +83,9 @@ install_python_deps() {
     if [ -f "pyproject.toml" ]; then
         pip install -e .
     fi
+
+    # Bytecode precompilado: el arranque no recompila main.py ni src/.
+    python -m compileall -q "$BASE_DIR/main.py" "$BASE_DIR/src" || true
     deactivate
 }
 
@@ -94,7 +97,9 @@ create_desktop_entry() {
 DIR="\$(cd "\$(dirname "\${BASH_SOURCE[0]}")" && pwd)"
 source "\$DIR/.venv/bin/activate"
 export QT_QPA_PLATFORM=xcb
-exec python "\$DIR/main.py" "\$@"
+cd "\$DIR"
+# -m main reutiliza __pycache__/main.*.pyc (un script no se cachea nunca).
+exec python -m main "\$@"
 EOF
     chmod +x "$WRAPPER_SCRIPT"
 
@@ -1,72 +1,154 @@
 #!/usr/bin/env python3
 import sys
-import argparse
-import time
 import os
-import traceback
 
-import setproctitle
-from PySide6.QtGui import QIcon
 
-setproctitle.setproctitle("komorebi")
+def _set_process_name(name: str) -> None:
+    """Renombra el proceso (comm) vía prctl(PR_SET_NAME) sin cargar setproctitle."""
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL("libc.so.6", use_errno=True)
+        if libc.prctl(15, name.encode("utf-8"), 0, 0, 0) == 0:  # PR_SET_NAME
+            return
+    except (OSError, AttributeError):
+        pass
+    try:
+        import setproctitle
+
+        setproctitle.setproctitle(name)
+    except Exception:
+        pass
+
+
+_set_process_name("komorebi")
 os.environ.setdefault("QT_DESKTOP_FILE_NAME", "komorebi")
+# Solo lo usa la GUI (QtMultimedia); el proceso de fondo usa libVLC.
+os.environ.setdefault("QT_MEDIA_BACKEND", "gstreamer")
 
 SINGLE_INSTANCE_SERVER_NAME = "komorebi_gui_single_instance"
+STARTUP_ERROR_LOG = "/tmp/komorebi_startup_error.log"
+
+
+def _single_instance_socket_path() -> str:
+    """Ruta del socket que crea QLocalServer (QDir.tempPath() + nombre)."""
+    return os.path.join(os.environ.get("TMPDIR") or "/tmp", SINGLE_INSTANCE_SERVER_NAME)
 
 
 def _notify_existing_instance() -> bool:
-    """Devuelve True si ya existe una instancia y se notificó."""
+    """Devuelve True si ya existe una instancia y se notificó.
+
+    Usa un socket AF_UNIX de la stdlib para no cargar QtNetwork en cada
+    arranque; el servidor solo existe en la instancia viva.
+    """
+    import socket
+
     try:
-        from PySide6.QtNetwork import QLocalSocket
-
-        sock = QLocalSocket()
-        sock.connectToServer(SINGLE_INSTANCE_SERVER_NAME)
-        if not sock.waitForConnected(150):
-            return False
-        sock.write(b"show\n")
-        sock.flush()
-        sock.waitForBytesWritten(150)
-        sock.disconnectFromServer()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(0.05)
+            # Arranque en frío: connect() falla al instante con ENOENT (sin
+            # socket) o ECONNREFUSED (socket huérfano); no hace falta un stat.
+            sock.connect(_single_instance_socket_path())
+            sock.sendall(b"show\n")
         return True
-    except Exception:
+    except OSError:
         return False
 
 
 def _start_single_instance_server(on_message):
-    """Inicia servidor local para single-instance."""
+    """Inicia servidor local para single-instance.
+
+    Socket AF_UNIX de la stdlib vigilado con QSocketNotifier: se integra en el
+    event loop de Qt sin QLocalServer/QLocalSocket (ni QtNetwork).
+    Devuelve (socket, notifier) o None; hay que mantener la referencia viva.
+    """
     try:
-        from PySide6.QtNetwork import QLocalServer
+        import socket
+        from PySide6.QtCore import QCoreApplication, QSocketNotifier
 
+        sock_path = _single_instance_socket_path()
         try:
-            QLocalServer.removeServer(SINGLE_INSTANCE_SERVER_NAME)
-        except Exception:
+            os.unlink(sock_path)
+        except FileNotFoundError:
             pass
 
-        server = QLocalServer()
-        if not server.listen(SINGLE_INSTANCE_SERVER_NAME):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            server.bind(sock_path)
+            server.listen(4)
+            server.setblocking(False)
+        except OSError:
+            server.close()
             return None
 
-        def _handle_new_connection():
-            sock = server.nextPendingConnection()
-            if sock is None:
-                return
+        notifier = QSocketNotifier(server.fileno(), QSocketNotifier.Type.Read)
 
-            def _read_and_dispatch():
+        def _handle_new_connections():
+            while True:
                 try:
-                    data = bytes(sock.readAll()).decode("utf-8", errors="ignore").strip()
-                    if data:
-                        on_message(data)
-                finally:
-                    sock.disconnectFromServer()
-
-            sock.readyRead.connect(_read_and_dispatch)
-            sock.disconnected.connect(sock.deleteLater)
-
-        server.newConnection.connect(_handle_new_connection)
-        return server
+                    conn, _ = server.accept()
+                except BlockingIOError:
+                    return
+                except OSError:
+                    return
+                with conn:
+                    # El cliente escribe el token justo tras conectar.
+                    conn.settimeout(0.1)
+                    try:
+                        # Protocolo de tokens ASCII: se compara en bytes, sin decodificar.
+                        data = conn.recv(64).strip()
+                    except OSError:
+                        continue
+                if data:
+                    on_message(data)
+
+        def _cleanup():
+            notifier.setEnabled(False)
+            server.close()
+            try:
+                os.unlink(sock_path)
+            except OSError:
+                pass
+
+        notifier.activated.connect(_handle_new_connections)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_cleanup)
+        return server, notifier
     except Exception:
         return None
 
+
+def _install_crash_log_hook() -> None:
+    """Registra en STARTUP_ERROR_LOG las excepciones no capturadas.
+
+    Formato ligero (fichero:línea por frame, sin leer el código fuente) escrito
+    con un único os.write; luego delega en el hook previo (stderr).
+    """
+    previous_hook = sys.excepthook
+
+    def _hook(exc_type, exc, tb):
+        try:
+            lines = ["Traceback (most recent call last):"]
+            # Variable propia: previous_hook necesita el `tb` original.
+            frame_tb = tb
+            while frame_tb is not None:
+                code = frame_tb.tb_frame.f_code
+                lines.append(f'  File "{code.co_filename}", line {frame_tb.tb_lineno}, in {code.co_name}')
+                frame_tb = frame_tb.tb_next
+            lines.append(f"{exc_type.__name__}: {exc}\n\n")
+            fd = os.open(STARTUP_ERROR_LOG, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, "\n".join(lines).encode("utf-8", errors="replace"))
+            finally:
+                os.close(fd)
+        except Exception:
+            pass
+        previous_hook(exc_type, exc, tb)
+
+    sys.excepthook = _hook
+
+
 if __name__ == "__main__":
     if "--background-player" in sys.argv:
         idx = sys.argv.index("--background-player")
@@ -74,59 +156,93 @@ if __name__ == "__main__":
         from src import background_player
         raise SystemExit(background_player.main(bg_argv))
 
-    # Solo aplica a la GUI (QtMultimedia). El proceso de fondo usa libVLC.
-    os.environ["QT_MEDIA_BACKEND"] = "gstreamer"
+    # Sin argumentos (lanzamiento normal) no hace falta cargar argparse.
+    if sys.argv[1:]:
+        import argparse
 
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--restore-only", action="store_true")
-    parser.add_argument("--delay", type=int, default=0)
-    args = parser.parse_args()
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--restore-only", action="store_true")
+        parser.add_argument("--delay", type=int, default=0)
+        args = parser.parse_args()
+    else:
+        from types import SimpleNamespace
+
+        args = SimpleNamespace(restore_only=False, delay=0)
 
     if args.delay:
+        import time
+
         time.sleep(args.delay)
 
     if _notify_existing_instance():
         raise SystemExit(0)
 
+    _install_crash_log_hook()
+
+    from PySide6.QtCore import QTimer
+    from PySide6.QtGui import QIcon
     from PySide6.QtWidgets import QApplication
     from src.gui import MainWindow
 
-    app = QApplication(sys.argv)
-    
+    # argparse ya validó los argumentos; Qt no necesita volver a escanearlos.
+    app = QApplication(["komorebi"])
+
     app.setApplicationName("Komorebi")
     app.setApplicationDisplayName("Komorebi")
     app.setDesktopFileName("komorebi")
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
     icon_path = os.path.join(script_dir, "icons", "Komorebi.png")
-    if os.path.exists(icon_path):
-        app.setWindowIcon(QIcon(icon_path))
 
-    app.setStyle("Fusion")
+    def _load_icon() -> None:
+        # Decodificar el PNG fuera del camino crítico hasta el primer frame.
+        # QIcon con una ruta inexistente queda nulo y no cambia nada, así que
+        # no hace falta un stat previo.
+        icon = QIcon(icon_path)
+        if not icon.isNull():
+            app.setWindowIcon(icon)
+
+    QTimer.singleShot(0, _load_icon)
 
     window = MainWindow()
+    # La UI se construye en el primer tick del event loop (tras el primer paint).
+    QTimer.singleShot(0, window.initialize)
+
+    def _prewarm_background_player() -> None:
+        # El servicio de fondo corre en otro proceso: importarlo aquí no le
+        # ahorra nada (y cargaría libVLC en la GUI). Lo que sí ayuda es que su
+        # .pyc esté al día antes de que engine.play() lo lance.
+        try:
+            import compileall
+
+            compileall.compile_file(os.path.join(script_dir, "src", "background_player.py"), quiet=2)
+        except Exception:
+            pass
+
+    if not getattr(sys, "frozen", False):
+        import threading
 
-    def _on_single_instance_message(msg: str) -> None:
-        m = (msg or "").strip().lower()
-        if m == "show":
+        threading.Thread(target=_prewarm_background_player, name="komorebi-prewarm", daemon=True).start()
+
+    def _on_single_instance_message(msg: bytes) -> None:
+        if msg.lower() == b"show":
             window.show()
             window.showNormal()
             window.raise_()
             window.activateWindow()
 
-    _single_instance_server = _start_single_instance_server(_on_single_instance_message)
+    _single_instance_server = None
 
-    try:
-        if args.restore_only:
-            sys.exit(app.exec())
-        else:
-            window.show()
-            sys.exit(app.exec())
-    except Exception:
-        try:
-            log_path = os.path.expanduser("/tmp/komorebi_startup_error.log")
-            with open(log_path, "a", encoding="utf-8") as f:
-                f.write(traceback.format_exc())
-                f.write("\n")
-        finally:
-            raise
\ No newline at end of file
+    def _start_single_instance_server_deferred() -> None:
+        # unlink + bind del socket no hacen falta hasta que llegue una segunda
+        # instancia; se sacan del camino hasta el primer paint.
+        global _single_instance_server
+        _single_instance_server = _start_single_instance_server(_on_single_instance_message)
+
+    QTimer.singleShot(250, _start_single_instance_server_deferred)
+
+    # --restore-only arranca oculto (solo bandeja + restauración de fondos).
+    if not args.restore_only:
+        window.show()
+
+    sys.exit(app.exec())
\ No newline at end of file
@@ -16,5 +16,6 @@ fi
 # Variable de entorno para asegurar compatibilidad con la ventana de fondo
 export QT_QPA_PLATFORM=xcb
 
-# Ejecutar la aplicación usando el intérprete del venv
-exec "$PYTHON_EXEC" "$SCRIPT_DIR/main.py" "$@"
\ No newline at end of file
+# Ejecutar la aplicación usando el intérprete del venv.
+# `-m main` reutiliza el bytecode de __pycache__ (un script no se cachea nunca).
+exec "$PYTHON_EXEC" -m main "$@"
\ No newline at end of file
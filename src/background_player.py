@@ -2,31 +2,38 @@
 
 import vlc
 
-from PySide6.QtWidgets import QApplication, QWidget
-from PySide6.QtCore import Qt, QTimer, QEvent, QPropertyAnimation, QEasingCurve
-from PySide6.QtGui import QGuiApplication
+from PySide6.QtWidgets import QApplication, QWidget, QGraphicsScene, QGraphicsPixmapItem, QGraphicsBlurEffect
+from PySide6.QtCore import Qt, QTimer, QEvent, QPropertyAnimation, QEasingCurve, QCoreApplication, QSocketNotifier, QMetaObject, Signal, QRectF
+from PySide6.QtGui import QGuiApplication, QImage, QPixmap, QPainter
 from PySide6.QtNetwork import QLocalServer, QLocalSocket
 from PySide6.QtDBus import QDBusConnection, QDBusMessage
-from PySide6.QtDBus import QDBusInterface
 
 import os
 import sys
 import signal
 import subprocess
 import argparse
+import atexit
+import dataclasses
 import json
 import fcntl
+import functools
 import gc
-from datetime import datetime
 from pathlib import Path
+from dataclasses import dataclass, field
+from enum import Enum, auto
+from typing import TextIO
 
 import shutil
 import re
+import threading
+import weakref
 
 import time
 try:
-    from Xlib import X, display as xlib_display
-    from Xlib.error import XError
+    from Xlib import X, Xatom, display as xlib_display
+    from Xlib.error import XError, CatchError
+    from Xlib.ext import randr as xlib_randr
     XLIB_AVAILABLE = True
 except ImportError:
     XLIB_AVAILABLE = False
@@ -37,6 +44,24 @@ try:
 except ImportError:
     GIO_AVAILABLE = False
 
+# Un Gio.Settings (schema parseado + proxy) por schema durante todo el proceso.
+_GIO_SETTINGS_CACHE: dict[str, "Gio.Settings"] = {}
+_GIO_SCHEMA_SOURCE: dict[str, "Gio.SettingsSchemaSource | None"] = {"source": None}
+
+
+def _gio_settings(schema: str, delayed: bool = False) -> "Gio.Settings":
+    """Gio.Settings cacheado; `delayed` da otro objeto en modo delay-apply para
+    escrituras agrupadas (el modo delay no se puede deshacer en el objeto)."""
+    cache_key = schema + "#delayed" if delayed else schema
+    settings = _GIO_SETTINGS_CACHE.get(cache_key)
+    if settings is None:
+        settings = Gio.Settings.new(schema)
+        if delayed:
+            settings.delay()
+        _GIO_SETTINGS_CACHE[cache_key] = settings
+    return settings
+
+
 def _gsettings_list_keys(schema: str) -> set[str] | None:
     try:
         out = subprocess.check_output(["gsettings", "list-keys", schema], text=True, stderr=subprocess.STDOUT)
@@ -45,9 +70,13 @@ def _gsettings_list_keys(schema: str) -> set[str] | None:
         return None
 
 
+@functools.lru_cache(maxsize=128)
 def _gsettings_has_key(schema: str, key: str) -> bool:
     if GIO_AVAILABLE:
-        source = Gio.SettingsSchemaSource.get_default()
+        source = _GIO_SCHEMA_SOURCE["source"]
+        if source is None:
+            source = Gio.SettingsSchemaSource.get_default()
+            _GIO_SCHEMA_SOURCE["source"] = source
         schema_obj = source.lookup(schema, True)
         return schema_obj.has_key(key) if schema_obj else False
     
@@ -58,11 +87,21 @@ def _gsettings_has_key(schema: str, key: str) -> bool:
         _GSETTINGS_KEYS_CACHE[schema] = cached
     return key in cached
 
+_MULTIARCH_TRIPLETS = {
+    "x86_64": "x86_64-linux-gnu",
+    "aarch64": "aarch64-linux-gnu",
+    "armv7l": "arm-linux-gnueabihf",
+    "armv6l": "arm-linux-gnueabihf",
+    "i686": "i386-linux-gnu",
+}
+
+
+@functools.cache
 def _detect_vlc_plugin_path() -> str | None:
-    candidates = [
-        "/usr/lib/x86_64-linux-gnu/vlc/plugins",
-        "/usr/lib/aarch64-linux-gnu/vlc/plugins",
-        "/usr/lib/arm-linux-gnueabihf/vlc/plugins",
+    # Primero el triplete multiarch de esta máquina: en Debian/Ubuntu acierta al primer stat.
+    triplet = _MULTIARCH_TRIPLETS.get(os.uname().machine)
+    candidates = [f"/usr/lib/{triplet}/vlc/plugins"] if triplet else []
+    candidates += [
         "/usr/lib/vlc/plugins",
         "/usr/lib64/vlc/plugins",
         "/usr/local/lib/vlc/plugins",
@@ -104,6 +143,14 @@ if os.environ.get("QT_QPA_PLATFORM", "").lower().startswith("wayland"):
 
 LOG_FILE = Path("/dev/shm/komorebi_wall.log")
 SERVER_NAME = "komorebi_wallpaper_service"
+# Comandos sin argumentos como un solo byte (sin JSON). Deben coincidir con src/engine.py.
+IPC_OP_PING = b"\x01"
+IPC_OP_STATUS = b"\x02"
+_IPC_OPCODES = {IPC_OP_PING: "ping", IPC_OP_STATUS: "status"}
+
+# Layout de monitores: por eventos (QScreen/RandR); el sondeo solo es respaldo.
+LAYOUT_EVENT_DEBOUNCE_MS = 300
+LAYOUT_FALLBACK_INTERVAL_MS = 30000
 
 GNOME_WALLPAPER_SYNC_INTERVAL_MS = 30000
 GNOME_WALLPAPER_MAX_DIMENSION = 480
@@ -114,6 +161,18 @@ GNOME_WALLPAPER_DEFAULT_MODE = "static"
 
 CONFIG_PATH = Path.home() / ".config" / "komorebi" / "config.json"
 
+# vlc.State es un ctypes.c_uint: se compara el entero (`.value`) en lugar de str().lower().
+_VLC_STATE_PLAYING = vlc.State.Playing.value
+_VLC_STATE_ENDED = vlc.State.Ended.value
+_VLC_STATE_STOPPED = vlc.State.Stopped.value
+_VLC_STATE_PAUSED = vlc.State.Paused.value
+_VLC_STATES_FINISHED = frozenset({_VLC_STATE_ENDED, _VLC_STATE_STOPPED})
+
+# Eventos libVLC que se reenvían al hilo Qt (ver BackgroundPlayer._vlc_event).
+_VLC_EV_PLAYING = vlc.EventType.MediaPlayerPlaying.value
+_VLC_EV_VOUT = vlc.EventType.MediaPlayerVout.value
+_VLC_EV_ERROR = vlc.EventType.MediaPlayerEncounteredError.value
+
 
 MIN_RATE = 0.25
 SAFE_MAX_RATE = 2.0
@@ -123,49 +182,149 @@ HARD_MAX_RATE = 2.5
 def _atomic_write_json(path: Path, payload: dict) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(path.suffix + ".tmp")
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
-        f.write("\n")
+    # Serializa en memoria y escribe de una vez (json.dump hace un write por token).
+    data = memoryview(json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8") + b"\n")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
     os.replace(tmp, path)
 
 
-def _load_config() -> dict:
+@dataclass(slots=True)
+class MonitorCfg:
+    """Entrada de `monitors` en config.json (valores por defecto del esquema)."""
+    enabled: bool = True
+    screen: int = 0
+    screen_name: str | None = None
+    video_path: str | None = None
+    volume: int = 0
+    pause_on_max: bool = False
+    paused: bool = False
+    speed: float = 1.0
+    # Claves desconocidas (p.ej. de versiones futuras): se conservan al guardar.
+    extra: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, entry: dict) -> "MonitorCfg":
+        entry = entry or {}
+        known = {k: entry[k] for k in _MONITOR_CFG_FIELDS if k in entry}
+        extra = {k: v for k, v in entry.items() if k not in _MONITOR_CFG_FIELDS}
+        return cls(**known, extra=extra)
+
+    def to_dict(self) -> dict:
+        out = dict(self.extra)
+        for k in _MONITOR_CFG_FIELDS:
+            out[k] = getattr(self, k)
+        return out
+
+
+_MONITOR_CFG_FIELDS = tuple(f.name for f in dataclasses.fields(MonitorCfg) if f.name != "extra")
+
+
+def _index_monitor_config(data: dict) -> dict:
+    """Convierte `monitors` a MonitorCfg y añade índices en memoria (`_by_name`, `_by_index`).
+
+    `_by_index` solo contiene entradas sin `screen_name`; en ambos gana la
+    primera aparición, igual que el escaneo lineal. No se persisten.
+    """
+    data["monitors"] = [MonitorCfg.from_dict(m) for m in (data.get("monitors") or []) if isinstance(m, dict)]
+    data["_by_name"] = {}
+    data["_by_index"] = {}
+    for m in data["monitors"]:
+        _register_monitor_cfg(data, m)
+    return data
+
+
+def _register_monitor_cfg(data: dict, m: MonitorCfg) -> None:
+    """Añade `m` a `_by_name`/`_by_index` (sin pisar una entrada anterior)."""
+    if m.screen_name:
+        data["_by_name"].setdefault(m.screen_name, m)
+    else:
+        try:
+            data["_by_index"].setdefault(int(m.screen), m)
+        except (TypeError, ValueError):
+            pass
+
+
+# Escrituras de config agrupadas: ráfagas de cambios (sliders) -> un solo write.
+CONFIG_SAVE_DEBOUNCE_MS = 250
+_CONFIG_SAVE_STATE: dict = {"pending": None, "timer": None}
+
+
+def _read_config_file() -> dict:
     try:
         if not CONFIG_PATH.exists():
-            return {"version": 1, "monitors": []}
+            return _index_monitor_config({"version": 1, "monitors": []})
         with open(CONFIG_PATH, "r", encoding="utf-8") as f:
             data = json.load(f)
         if not isinstance(data, dict):
-            return {"version": 1, "monitors": []}
+            return _index_monitor_config({"version": 1, "monitors": []})
         data.setdefault("version", 1)
         data.setdefault("monitors", [])
         if not isinstance(data["monitors"], list):
             data["monitors"] = []
-        return data
+        return _index_monitor_config(data)
     except Exception as e:
         _log(f"ERROR leyendo config: {e}")
-        return {"version": 1, "monitors": []}
+        return _index_monitor_config({"version": 1, "monitors": []})
 
 
-def _save_config(data: dict) -> None:
+def _merge_pending_monitors(data: dict, pending: dict) -> dict:
+    """`data` (leído de disco) con la lista `monitors` pendiente del servicio.
+
+    La GUI escribe el resto de claves del mismo fichero: solo `monitors` (y
+    sus índices) es del servicio y puede ir por delante de lo que hay en disco.
+    """
+    data["monitors"] = pending["monitors"]
+    data["_by_name"] = pending["_by_name"]
+    data["_by_index"] = pending["_by_index"]
+    return data
+
+
+def _load_config() -> dict:
+    data = _read_config_file()
+    pending = _CONFIG_SAVE_STATE["pending"]
+    if pending is not None:
+        # Los monitors pendientes de escribir son más nuevos que los del disco.
+        _merge_pending_monitors(data, pending)
+    return data
+
+
+def _flush_config() -> None:
+    """Escribe a disco los monitors pendientes (si los hay) sobre la config actual."""
+    pending = _CONFIG_SAVE_STATE["pending"]
+    _CONFIG_SAVE_STATE["pending"] = None
+    if pending is None:
+        return
     try:
-        _atomic_write_json(CONFIG_PATH, data)
+        # Relee: la GUI pudo guardar sus claves durante el debounce.
+        data = _merge_pending_monitors(_read_config_file(), pending)
+        payload = {k: v for k, v in data.items() if not k.startswith("_by_")}
+        payload["monitors"] = [m.to_dict() if isinstance(m, MonitorCfg) else m for m in payload.get("monitors") or []]
+        _atomic_write_json(CONFIG_PATH, payload)
     except Exception as e:
         _log(f"ERROR guardando config: {e}")
 
 
-def _normalize_monitor_entry(entry: dict) -> dict:
-    """Normaliza esquema de monitor para compatibilidad futura."""
-    out = dict(entry or {})
-    out.setdefault("enabled", True)
-    out.setdefault("screen", 0)
-    out.setdefault("screen_name", None)
-    out.setdefault("video_path", None)
-    out.setdefault("volume", 0)
-    out.setdefault("pause_on_max", False)
-    out.setdefault("paused", False)
-    out.setdefault("speed", 1.0)
-    return out
+def _save_config(data: dict) -> None:
+    """Programa la escritura de `data` tras CONFIG_SAVE_DEBOUNCE_MS (sin event loop: inmediata)."""
+    _CONFIG_SAVE_STATE["pending"] = data
+    timer = _CONFIG_SAVE_STATE["timer"]
+    if timer is None:
+        app = QCoreApplication.instance()
+        if app is None:
+            _flush_config()
+            return
+        timer = QTimer(app)
+        timer.setSingleShot(True)
+        timer.setInterval(CONFIG_SAVE_DEBOUNCE_MS)
+        timer.timeout.connect(_flush_config)
+        _CONFIG_SAVE_STATE["timer"] = timer
+        atexit.register(_flush_config)
+    timer.start()
 
 
 def _upsert_monitor_config(
@@ -178,86 +337,238 @@ def _upsert_monitor_config(
     paused: bool,
     speed: float = 1.0,
 ) -> None:
+    _upsert_monitor_configs([
+        {
+            "screen_index": screen_index,
+            "screen_name": screen_name,
+            "video_path": video_path,
+            "volume": volume,
+            "pause_on_max": pause_on_max,
+            "paused": paused,
+            "speed": speed,
+        }
+    ])
+
+
+def _upsert_monitor_configs(rows: list[dict]) -> None:
+    """Upsert de varias entradas (kwargs de `_upsert_monitor_config`) con un solo load/save."""
+    data = _load_config()
+    changed = False
+    for row in rows:
+        screen_index = int(row["screen_index"])
+        screen_name = row.get("screen_name")
+        values = {
+            "enabled": True,
+            "screen": screen_index,
+            "screen_name": screen_name,
+            "video_path": row["video_path"],
+            "volume": int(row["volume"]),
+            "pause_on_max": bool(row["pause_on_max"]),
+            "paused": bool(row["paused"]),
+            "speed": float(row.get("speed", 1.0)),
+        }
+
+        entry = (data["_by_name"].get(screen_name) if screen_name else None) or data["_by_index"].get(screen_index)
+        if entry is None:
+            entry = MonitorCfg(**values)
+            data["monitors"].append(entry)
+        else:
+            before = dataclasses.replace(entry)
+            for k, v in values.items():
+                setattr(entry, k, v)
+            if entry == before:
+                continue
+        # La config pendiente se reutiliza en memoria: la entrada nueva (o que
+        # acaba de ganar nombre) debe ser localizable en el siguiente upsert.
+        _register_monitor_cfg(data, entry)
+        changed = True
+
+    if changed:
+        _save_config(data)
+
+
+def _disable_monitor_config(*, screen_index: int, screen_name: str | None) -> None:
     data = _load_config()
-    monitors = [_normalize_monitor_entry(m) for m in (data.get("monitors") or []) if isinstance(m, dict)]
+    if screen_name:
+        matches = [m for m in data["monitors"] if m.screen_name == screen_name]
+    else:
+        matches = [m for m in data["monitors"] if int(m.screen) == int(screen_index)]
+    changed = False
+    for m in matches:
+        if m.enabled:
+            m.enabled = False
+            changed = True
+    if changed:
+        _save_config(data)
+
+
+_RANDR_STATE: dict = {"display": None, "failed": False, "notifier": None, "listeners": [], "epoch": 0}
+
+
+def _drain_randr_events() -> int:
+    disp = _RANDR_STATE["display"]
+    count = 0
+    if disp is None:
+        return 0
+    try:
+        while disp.pending_events():
+            disp.next_event()
+            count += 1
+    except Exception:
+        pass
+    return count
+
+
+def _on_randr_event_ready() -> None:
+    """Evento RandR (pantalla/CRTC/salida cambió): invalida la cache de monitores
+    y avisa a los suscriptores de `_RANDR_STATE["listeners"]`."""
+    if _drain_randr_events():
+        _MONITOR_CACHE["timestamp"] = 0
+        _RANDR_STATE["epoch"] += 1
+        for listener in list(_RANDR_STATE["listeners"]):
+            try:
+                listener()
+            except Exception as e:
+                _log(f" Error en listener RandR: {e}")
+
+
+def _watch_randr_changes(disp) -> None:
+    """Suscribe a RRScreenChangeNotify (+CRTC/Output) y los drena desde el event loop.
+
+    Con el watcher activo la cache de monitores no caduca por tiempo: solo se
+    invalida cuando llega un evento.
+    """
+    if _RANDR_STATE["notifier"] is not None or QCoreApplication.instance() is None:
+        return
+    try:
+        disp.screen().root.xrandr_select_input(
+            xlib_randr.RRScreenChangeNotifyMask
+            | xlib_randr.RRCrtcChangeNotifyMask
+            | xlib_randr.RROutputChangeNotifyMask
+        )
+        disp.flush()
+        notifier = QSocketNotifier(disp.fileno(), QSocketNotifier.Type.Read)
+        notifier.activated.connect(_on_randr_event_ready)
+        _RANDR_STATE["notifier"] = notifier
+    except Exception as e:
+        _log(f" No se pudo suscribir a eventos RandR: {e}")
+
 
-    matched = False
-    for m in monitors:
-        if screen_name and m.get("screen_name") == screen_name:
-            m.update(
+def _xlib_randr_monitors() -> list[dict] | None:
+    """Lista de monitores vía RandR 1.5 (RRGetMonitors) sobre python-xlib.
+
+    Es la misma petición que hace `xrandr --listmonitors` (mismo orden de
+    índices), pero sin fork/exec y sin forzar un sondeo de hardware.
+    Devuelve None si Xlib/RandR 1.5 no están disponibles.
+    """
+    if not XLIB_AVAILABLE or _RANDR_STATE["failed"]:
+        return None
+    try:
+        disp = _RANDR_STATE["display"]
+        if disp is None:
+            disp = xlib_display.Display()
+            if not disp.has_extension("RANDR"):
+                raise RuntimeError("extensión RANDR no disponible")
+            ver = disp.xrandr_query_version()
+            if (ver.major_version, ver.minor_version) < (1, 5):
+                raise RuntimeError(f"RandR {ver.major_version}.{ver.minor_version} < 1.5")
+            _RANDR_STATE["display"] = disp
+        _watch_randr_changes(disp)
+        reply = disp.screen().root.xrandr_get_monitors(is_active=True)
+        # Eventos leídos junto con la respuesta son anteriores a estos datos.
+        _drain_randr_events()
+        monitors: list[dict] = []
+        for m in reply.monitors:
+            monitors.append(
                 {
-                    "enabled": True,
-                    "screen": int(screen_index),
-                    "screen_name": screen_name,
-                    "video_path": video_path,
-                    "volume": int(volume),
-                    "pause_on_max": bool(pause_on_max),
-                    "paused": bool(paused),
-                    "speed": float(speed),
+                    "name": disp.get_atom_name(m.name),
+                    "x": int(m.x),
+                    "y": int(m.y),
+                    "w": int(m.width_in_pixels),
+                    "h": int(m.height_in_pixels),
                 }
             )
-            matched = True
-            break
-
-    if not matched:
-        for m in monitors:
-            if int(m.get("screen", -1)) == int(screen_index) and not m.get("screen_name"):
-                m.update(
-                    {
-                        "enabled": True,
-                        "screen": int(screen_index),
-                        "screen_name": screen_name,
-                        "video_path": video_path,
-                        "volume": int(volume),
-                        "pause_on_max": bool(pause_on_max),
-                        "paused": bool(paused),
-                        "speed": float(speed),
-                    }
-                )
-                matched = True
-                break
+        return monitors
+    except Exception as e:
+        _log(f" RandR vía Xlib no disponible, usando xrandr: {e}")
+        _RANDR_STATE["failed"] = True
+        _RANDR_STATE["display"] = None
+        notifier = _RANDR_STATE["notifier"]
+        if notifier is not None:
+            notifier.setEnabled(False)
+            _RANDR_STATE["notifier"] = None
+        return None
 
-    if not matched:
-        monitors.append(
-            {
-                "enabled": True,
-                "screen": int(screen_index),
-                "screen_name": screen_name,
-                "video_path": video_path,
-                "volume": int(volume),
-                "pause_on_max": bool(pause_on_max),
-                "paused": bool(paused),
-                "speed": float(speed),
-            }
-        )
 
-    data["monitors"] = monitors
-    _save_config(data)
+DRM_SYSFS_DIR = "/sys/class/drm"
+_DRM_STATE: dict = {"outputs": None}
 
 
-def _disable_monitor_config(*, screen_index: int, screen_name: str | None) -> None:
-    data = _load_config()
-    monitors = [_normalize_monitor_entry(m) for m in (data.get("monitors") or []) if isinstance(m, dict)]
-    for m in monitors:
-        if screen_name and m.get("screen_name") == screen_name:
-            m["enabled"] = False
-        elif int(m.get("screen", -1)) == int(screen_index) and not screen_name:
-            m["enabled"] = False
-    data["monitors"] = monitors
-    _save_config(data)
+def _drm_connected_outputs() -> frozenset[str] | None:
+    """Conectores DRM con status "connected" (p.ej. "HDMI-A-1"), leídos de sysfs.
+
+    No pasa por X: sirve para detectar hotplug sin preguntar a RandR. Los
+    nombres del kernel no siempre coinciden con los de xrandr, por eso solo se
+    compara el conjunto. None si sysfs no está disponible.
+    """
+    connected = set()
+    try:
+        with os.scandir(DRM_SYSFS_DIR) as it:
+            for entry in it:
+                card, sep, connector = entry.name.partition("-")
+                if not sep:
+                    continue  # card0, renderD128...
+                try:
+                    with open(entry.path + "/status", "rb", buffering=0) as f:
+                        if f.read(16).startswith(b"connected"):
+                            connected.add(connector)
+                except OSError:
+                    pass
+    except OSError:
+        return None
+    return frozenset(connected)
+
+
+def _drm_outputs_changed() -> bool:
+    """True si el conjunto de conectores DRM cambió desde la última consulta."""
+    outputs = _drm_connected_outputs()
+    if outputs is None:
+        return False
+    previous = _DRM_STATE["outputs"]
+    _DRM_STATE["outputs"] = outputs
+    return previous is not None and outputs != previous
+
+
+# `xrandr --listmonitors`: W/mmWxH/mmH+X+Y -> (w, h, x, y)
+_XRANDR_GEOM_RE = re.compile(r"(\d+)/\d+x(\d+)/\d+\+(-?\d+)\+(-?\d+)")
 
 
 def _xrandr_monitors(force_refresh: bool = False) -> list[dict]:
     now = time.time()
 
-    if not force_refresh and (now - _MONITOR_CACHE["timestamp"]) < _MONITOR_CACHE["min_interval"]:
-        return _MONITOR_CACHE["data"]
-    
+    # Con suscripción a eventos RandR la cache vale hasta que llegue uno
+    # (timestamp 0 = invalidada).
+    watching = _RANDR_STATE["notifier"] is not None
+    ttl = float("inf") if watching else _MONITOR_CACHE["min_interval"]
+    cached_ts = _MONITOR_CACHE["timestamp"]
+    if not force_refresh and cached_ts and (now - cached_ts) < ttl:
+        # Sin eventos RandR, un hotplug visto en sysfs no espera a que caduque el TTL.
+        if watching or not _drm_outputs_changed():
+            return _MONITOR_CACHE["data"]
+
+    xlib_monitors = _xlib_randr_monitors()
+    if xlib_monitors is not None:
+        if xlib_monitors:
+            _MONITOR_CACHE["data"] = xlib_monitors
+            _MONITOR_CACHE["timestamp"] = now
+        return xlib_monitors
+
     if not shutil.which("xrandr"):
         return []
     try:
         out = subprocess.check_output(
-            ["xrandr", "--listmonitors"], 
+            # --current: configuración actual sin sondear hardware (EDID/DDC).
+            ["xrandr", "--listmonitors", "--current"],
             text=True, 
             stderr=subprocess.STDOUT,
             timeout=2
@@ -267,7 +578,6 @@ def _xrandr_monitors(force_refresh: bool = False) -> list[dict]:
         return _MONITOR_CACHE["data"]
 
     monitors: list[dict] = []
-    geom_re = re.compile(r"(?P<w>\d+)/(?:\d+)x(?P<h>\d+)/(?:\d+)\+(?P<x>-?\d+)\+(?P<y>-?\d+)")
 
     for line in out.splitlines():
         line = line.strip()
@@ -276,21 +586,18 @@ def _xrandr_monitors(force_refresh: bool = False) -> list[dict]:
         parts = line.split()
         if len(parts) < 3 or not parts[0].endswith(":"):
             continue
-        m = None
-        for p in parts:
-            m = geom_re.match(p)
-            if m:
-                break
+        m = _XRANDR_GEOM_RE.search(line)
         if not m:
             continue
+        w, h, x, y = m.groups()
         name = parts[-1]
         monitors.append(
             {
                 "name": name,
-                "x": int(m.group("x")),
-                "y": int(m.group("y")),
-                "w": int(m.group("w")),
-                "h": int(m.group("h")),
+                "x": int(x),
+                "y": int(y),
+                "w": int(w),
+                "h": int(h),
             }
         )
     
@@ -330,20 +637,59 @@ def _current_monitor_inventory() -> list[dict]:
     return inv
 
 
+_LOG_FH: TextIO | None = None
+# Trazas de diagnóstico (estado de VLC, etc.): solo con KOMOREBI_DEBUG=1.
+_LOG_DEBUG = os.environ.get("KOMOREBI_DEBUG", "").strip().lower() in {"1", "true", "yes", "on"}
+# Prefijo "[HH:MM:SS] " reutilizado mientras no cambie el segundo.
+_LOG_PREFIX_CACHE = {"sec": -1, "prefix": ""}
+
+
 def _log(msg: str):
-    line = f"[{datetime.now().strftime('%H:%M:%S')}] {msg}"
+    global _LOG_FH
+    now = int(time.time())
+    if now != _LOG_PREFIX_CACHE["sec"]:
+        _LOG_PREFIX_CACHE["sec"] = now
+        _LOG_PREFIX_CACHE["prefix"] = time.strftime("[%H:%M:%S] ", time.localtime(now))
+    line = _LOG_PREFIX_CACHE["prefix"] + msg
     print(line, flush=True)
     try:
-        LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(line)
-            f.write("\n")
+        if _LOG_FH is None:
+            # Se abre una sola vez (line-buffered): un write por línea, sin open/close.
+            LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _LOG_FH = open(LOG_FILE, "a", encoding="utf-8", buffering=1)
+            atexit.register(_LOG_FH.flush)
+        _LOG_FH.write(line + "\n")
     except Exception:
         pass
 
+
+def _log_debug(fmt: str, *args) -> None:
+    """Como _log, pero formatea (estilo %) solo si KOMOREBI_DEBUG está activo."""
+    if _LOG_DEBUG:
+        _log(fmt % args)
+
+
 class X11WindowDetector:
-    """Detecta ventanas maximizadas sin subprocess usando python-xlib directamente."""
+    """Detecta ventanas maximizadas sin subprocess usando python-xlib directamente.
+
+    Con event loop de Qt se suscribe a PropertyNotify (_NET_ACTIVE_WINDOW en el
+    root, _NET_WM_STATE en la ventana activa) y mantiene el resultado en cache:
+    consultar es leer un booleano. Sin watcher, consulta con un TTL corto.
+    """
+    # Los players consultan en el mismo tick: comparten un round-trip.
+    MAXIMIZED_CACHE_TTL_S = 0.25
+    # _NET_WM_STATE nunca lleva tantos átomos: una sola petición basta.
+    WM_STATE_MAX_ATOMS = 64
+
     def __init__(self):
+        self._maximized_cache = (False, float("-inf"))  # (valor, time.monotonic())
+        self._notifier: QSocketNotifier | None = None
+        self._watch_failed = False
+        self._tracked_window = None
+        self._is_maximized = False
+        # Sube con cada cambio de ventana activa/_NET_WM_STATE visto por eventos.
+        self.event_epoch = 0
+        self._atoms: dict[str, int] = {}
         if not XLIB_AVAILABLE:
             self.display = None
             return
@@ -358,25 +704,148 @@ class X11WindowDetector:
             _log(f"Error inicializando X11WindowDetector: {e}")
             self.display = None
     
+    def active_window_id(self) -> int | None:
+        """_NET_ACTIVE_WINDOW del root (0 si no hay ventana activa)."""
+        if self.display is None:
+            return None
+        try:
+            # Un solo GetProperty de longitud fija (get_full_property puede repetirlo).
+            active = self.root.get_property(self._net_active, X.AnyPropertyType, 0, 1)
+            if not active or not active.value:
+                return None
+            return int(active.value[0])
+        except (XError, Exception):
+            return None
+
     def is_any_window_maximized(self) -> bool:
         """Retorna True si la ventana activa está maximizada."""
         if self.display is None:
             return False
-        
+
+        if self.watching():
+            # Eventos que Xlib ya leyó del socket junto con otra respuesta no
+            # despiertan al notifier: se drenan aquí (sin round-trip).
+            self._process_events()
+            return self._is_maximized
+
+        now = time.monotonic()
+        cached, cached_at = self._maximized_cache
+        if (now - cached_at) < self.MAXIMIZED_CACHE_TTL_S:
+            return cached
+        result = self._query_maximized()
+        self._maximized_cache = (result, now)
+        return result
+
+    def watching(self) -> bool:
+        """Arranca (una vez) la suscripción a PropertyNotify; True si está activa."""
+        if self._notifier is None and not self._watch_failed:
+            self._start_watching()
+        return self._notifier is not None
+
+    def _start_watching(self) -> None:
+        if QCoreApplication.instance() is None:
+            return
+        try:
+            self.root.change_attributes(event_mask=X.PropertyChangeMask)
+            self._track_active_window()
+            notifier = QSocketNotifier(self.display.fileno(), QSocketNotifier.Type.Read)
+            notifier.activated.connect(self._process_events)
+            self._notifier = notifier
+        except Exception as e:
+            _log(f"X11WindowDetector: sin eventos PropertyNotify, usando sondeo: {e}")
+            self._watch_failed = True
+
+    def _track_active_window(self) -> None:
+        """Mueve la suscripción de _NET_WM_STATE a la ventana activa actual y recalcula."""
+        win_id = self.active_window_id() or 0
+        tracked = self._tracked_window
+        if tracked is None or tracked.id != win_id:
+            catch = CatchError()  # la ventana anterior puede haber desaparecido (BadWindow)
+            if tracked is not None:
+                tracked.change_attributes(event_mask=X.NoEventMask, onerror=catch)
+            tracked = self.display.create_resource_object('window', win_id) if win_id else None
+            if tracked is not None:
+                tracked.change_attributes(event_mask=X.PropertyChangeMask, onerror=catch)
+            self._tracked_window = tracked
+            self.display.flush()
+        # Suscripción antes de leer: no se pierde un cambio entre medias.
+        self._is_maximized = self._window_is_maximized(win_id)
+
+    def _process_events(self) -> None:
         try:
-            active = self.root.get_full_property(
-                self._net_active, X.AnyPropertyType
+            active_changed = False
+            state_changed = False
+            while self.display.pending_events():
+                ev = self.display.next_event()
+                if ev.type != X.PropertyNotify:
+                    continue
+                if ev.atom == self._net_active and ev.window.id == self.root.id:
+                    active_changed = True
+                elif ev.atom == self._net_wm_state:
+                    tracked = self._tracked_window
+                    if tracked is not None and ev.window.id == tracked.id:
+                        state_changed = True
+            if active_changed:
+                self._track_active_window()
+            elif state_changed:
+                self._is_maximized = self._window_is_maximized(self._tracked_window.id)
+            if active_changed or state_changed:
+                self.event_epoch += 1
+        except Exception as e:
+            _log(f"X11WindowDetector: error procesando eventos: {e}")
+
+    def _query_maximized(self) -> bool:
+        return self._window_is_maximized(self.active_window_id())
+
+    def _atom(self, name: str) -> int:
+        atom = self._atoms.get(name)
+        if atom is None:
+            atom = self._atoms[name] = self.display.intern_atom(name)
+        return atom
+
+    def set_desktop_window_props(self, win_id: int) -> bool:
+        """Marca la ventana como fondo (tipo DESKTOP + skip taskbar/pager, below, sticky).
+
+        Equivale a los dos `xprop -set` de antes, sobre la conexión ya abierta.
+        """
+        if self.display is None:
+            return False
+        try:
+            catch = CatchError()
+            window = self.display.create_resource_object('window', int(win_id))
+            window.change_property(
+                self._atom('_NET_WM_WINDOW_TYPE'), Xatom.ATOM, 32,
+                [self._atom('_NET_WM_WINDOW_TYPE_DESKTOP')],
+                onerror=catch,
             )
-            if not active or not active.value:
+            window.change_property(
+                self._net_wm_state, Xatom.ATOM, 32,
+                [self._atom(n) for n in (
+                    '_NET_WM_STATE_SKIP_TASKBAR',
+                    '_NET_WM_STATE_SKIP_PAGER',
+                    '_NET_WM_STATE_BELOW',
+                    '_NET_WM_STATE_STICKY',
+                )],
+                onerror=catch,
+            )
+            # sync = flush + round-trip: un BadWindow llega antes de volver.
+            self.display.sync()
+            if catch.get_error():
+                _log(f"Error aplicando propiedades X11 vía Xlib: {catch.get_error()}")
                 return False
-            
-            win_id = active.value[0]
-            if win_id == 0:
+            return True
+        except (XError, Exception) as e:
+            _log(f"Error aplicando propiedades X11 vía Xlib: {e}")
+            return False
+
+    def _window_is_maximized(self, win_id: int | None) -> bool:
+        try:
+            if not win_id:
                 return False
             
             window = self.display.create_resource_object('window', win_id)
-            state = window.get_full_property(
-                self._net_wm_state, X.AnyPropertyType
+            state = window.get_property(
+                self._net_wm_state, X.AnyPropertyType, 0, self.WM_STATE_MAX_ATOMS
             )
             
             if not state:
@@ -388,6 +857,162 @@ class X11WindowDetector:
         except (XError, Exception):
             return False
 
+_SHARED_X11_DETECTOR: X11WindowDetector | None = None
+_SHARED_X11_DETECTOR_FAILED = False
+_SHARED_X11_DETECTOR_LOCK = threading.Lock()
+
+
+def _get_shared_x11_detector() -> X11WindowDetector | None:
+    """Detector X11 único por proceso (una conexión y un juego de átomos para todos los players)."""
+    global _SHARED_X11_DETECTOR, _SHARED_X11_DETECTOR_FAILED
+    if not XLIB_AVAILABLE:
+        return None
+    with _SHARED_X11_DETECTOR_LOCK:
+        if _SHARED_X11_DETECTOR is None and not _SHARED_X11_DETECTOR_FAILED:
+            try:
+                detector = X11WindowDetector()
+            except Exception:
+                detector = None
+            if detector is None or detector.display is None:
+                _SHARED_X11_DETECTOR_FAILED = True
+            else:
+                _SHARED_X11_DETECTOR = detector
+        return _SHARED_X11_DETECTOR
+
+
+def _window_events_epoch() -> int | None:
+    """Contador de cambios de ventanas (PropertyNotify) y de layout (RandR).
+
+    Si no cambió desde la última consulta, el estado maximizado tampoco.
+    None cuando no hay una fuente de eventos fiable (Wayland: XWayland no ve
+    las ventanas nativas; sin Xlib o sin PropertyNotify): hay que sondear.
+    """
+    if os.environ.get("XDG_SESSION_TYPE", "").lower() == "wayland":
+        return None
+    detector = _get_shared_x11_detector()
+    if detector is None or not detector.watching():
+        return None
+    detector._process_events()
+    return detector.event_epoch + _RANDR_STATE["epoch"]
+
+
+class _XpropSpy:
+    """Fallback sin Xlib: `xprop -spy` persistente en vez de un xprop por tick.
+
+    Un proceso sigue _NET_ACTIVE_WINDOW en la raíz y otro el _NET_WM_STATE de
+    la ventana activa (se relanza al cambiar de ventana). Sus stdout se leen
+    desde el event loop con QSocketNotifier; consultar el estado no hace E/S.
+    """
+
+    def __init__(self):
+        self.active_wid: str | None = None
+        self.maximized = False
+        self._root = self._spawn(["xprop", "-spy", "-root", "_NET_ACTIVE_WINDOW"], self._on_root_line)
+        self._window = None
+        atexit.register(self.stop)
+
+    @property
+    def alive(self) -> bool:
+        return self._root is not None
+
+    def _spawn(self, cmd: list[str], on_line):
+        """Lanza `cmd` y devuelve (proc, notifier, buffer) o None si falla."""
+        try:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0)
+        except Exception as e:
+            _log(f" No se pudo lanzar xprop -spy: {e}")
+            return None
+        fd = proc.stdout.fileno()
+        os.set_blocking(fd, False)
+        entry = [proc, QSocketNotifier(fd, QSocketNotifier.Type.Read), bytearray()]
+        entry[1].activated.connect(lambda *_: self._on_ready(entry, on_line))
+        return entry
+
+    def _on_ready(self, entry, on_line) -> None:
+        proc, notifier, buf = entry
+        try:
+            while True:
+                chunk = os.read(proc.stdout.fileno(), 4096)
+                if not chunk:
+                    # EOF: xprop terminó (p.ej. la ventana se destruyó).
+                    notifier.setEnabled(False)
+                    break
+                buf += chunk
+        except BlockingIOError:
+            pass
+        except OSError:
+            notifier.setEnabled(False)
+        *lines, rest = buf.split(b"\n")
+        buf[:] = rest
+        for line in lines:
+            on_line(line)
+        if not notifier.isEnabled():
+            self._reap(entry)
+            if entry is self._root:
+                self._root = None
+            elif entry is self._window:
+                self._window = None
+                self.maximized = False
+
+    def _on_root_line(self, line: bytes) -> None:
+        # _NET_ACTIVE_WINDOW(WINDOW): window id # 0x3a00007
+        _, sep, wid = line.partition(b"#")
+        wid = wid.split(b",")[0].strip().decode("ascii", "replace") if sep else None
+        if wid == self.active_wid:
+            return
+        self.active_wid = wid
+        if self._window is not None:
+            self._reap(self._window)
+            self._window = None
+        self.maximized = False
+        if wid and wid != "0x0":
+            self._window = self._spawn(["xprop", "-spy", "-id", wid, "_NET_WM_STATE"], self._on_window_line)
+
+    def _on_window_line(self, line: bytes) -> None:
+        # _NET_WM_STATE(ATOM) = _NET_WM_STATE_MAXIMIZED_VERT, ... | "_NET_WM_STATE:  not found."
+        self.maximized = b"_NET_WM_STATE_MAXIMIZED_VERT" in line and b"_NET_WM_STATE_MAXIMIZED_HORZ" in line
+
+    @staticmethod
+    def _reap(entry) -> None:
+        proc, notifier, _ = entry
+        notifier.setEnabled(False)
+        try:
+            proc.terminate()
+            proc.wait(timeout=0.5)
+        except Exception:
+            pass
+        try:
+            proc.stdout.close()
+        except Exception:
+            pass
+
+    def stop(self) -> None:
+        for entry in (self._window, self._root):
+            if entry is not None:
+                self._reap(entry)
+        self._window = self._root = None
+
+
+_SHARED_XPROP_SPY: _XpropSpy | None = None
+_SHARED_XPROP_SPY_FAILED = False
+
+
+def _get_shared_xprop_spy() -> _XpropSpy | None:
+    """`xprop -spy` único por proceso; solo se usa si no hay detector Xlib."""
+    global _SHARED_XPROP_SPY, _SHARED_XPROP_SPY_FAILED
+    if _SHARED_XPROP_SPY is not None and not _SHARED_XPROP_SPY.alive:
+        _SHARED_XPROP_SPY = None
+    if _SHARED_XPROP_SPY is None and not _SHARED_XPROP_SPY_FAILED:
+        if not shutil.which("xprop") or QCoreApplication.instance() is None:
+            _SHARED_XPROP_SPY_FAILED = True
+            return None
+        spy = _XpropSpy()
+        if spy.alive:
+            _SHARED_XPROP_SPY = spy
+        else:
+            _SHARED_XPROP_SPY_FAILED = True
+    return _SHARED_XPROP_SPY
+
 def check_session_type():
     """Retorna el tipo de sesión (wayland o x11) y si es GNOME"""
     session = os.environ.get("XDG_SESSION_TYPE", "x11").lower()
@@ -402,11 +1027,27 @@ def is_gnome() -> bool:
     return "GNOME" in os.environ.get("XDG_CURRENT_DESKTOP", "").upper()
 
 
+_QT_PLATFORM: str | None = None
+
+
+def _qt_platform() -> str:
+    """platformName() de Qt en minúsculas ("xcb", "wayland"...).
+
+    Queda fijo al crear la QApplication: se lee una vez y se guarda.
+    """
+    global _QT_PLATFORM
+    if _QT_PLATFORM is None:
+        if QGuiApplication.instance() is None:
+            return ""
+        _QT_PLATFORM = (QGuiApplication.platformName() or "").lower()
+    return _QT_PLATFORM
+
+
 def _gsettings_get(key: str) -> str | None:
     schema = "org.gnome.desktop.background"
     if GIO_AVAILABLE:
         try:
-            settings = Gio.Settings.new(schema)
+            settings = _gio_settings(schema)
             return settings.get_value(key).print_(True)
         except: return None
 
@@ -417,6 +1058,7 @@ def _gsettings_get(key: str) -> str | None:
     except: return None
 
 
+@functools.lru_cache(maxsize=32)
 def _gsettings_quote(value: str) -> str:
     """Convierte un string Python a un literal válido para `gsettings set`.
 
@@ -433,7 +1075,7 @@ def _gsettings_quote(value: str) -> str:
 def _gsettings_set_schema(schema: str, key: str, value: str) -> bool:
     if GIO_AVAILABLE:
         try:
-            settings = Gio.Settings.new(schema)
+            settings = _gio_settings(schema)
             clean_value = value.strip("'").strip('"')
             return settings.set_string(key, clean_value)
         except Exception as e:
@@ -448,28 +1090,183 @@ def _gsettings_set_schema(schema: str, key: str, value: str) -> bool:
 def _gsettings_set(key: str, value: str) -> bool:
     return _gsettings_set_schema("org.gnome.desktop.background", key, _gsettings_quote(value))
 
-def _cleanup_old_snapshots(directory: Path, max_age_seconds: int = 300):
-    """Borra snapshots más viejos de N segundos para evitar acumulación en /dev/shm."""
+
+def _gsettings_set_many(schema: str, values: dict[str, str]) -> bool:
+    """Escribe varias claves string de `schema` de una vez.
+
+    Con Gio, apply() manda un único changeset a dconf en vez de una escritura
+    por clave; sin Gio, un `gsettings set` por clave como antes.
+    """
+    if GIO_AVAILABLE:
+        try:
+            settings = _gio_settings(schema, delayed=True)
+            for key, value in values.items():
+                settings.set_string(key, value)
+            settings.apply()
+            return True
+        except Exception as e:
+            _log(f"Error Gio: {e}")
+
+    ok = False
+    for key, value in values.items():
+        ok = _gsettings_set_schema(schema, key, _gsettings_quote(value)) or ok
+    return ok
+
+_GNOME_EVAL_MESSAGES: dict[str, QDBusMessage] = {}
+
+
+def _gnome_shell_eval(script: str) -> tuple[bool, str | None]:
+    """Ejecuta JS en GNOME Shell via DBus Eval (best-effort)."""
+    try:
+        # Los scripts son constantes: el mensaje se construye una vez por script.
+        msg = _GNOME_EVAL_MESSAGES.get(script)
+        if msg is None:
+            msg = QDBusMessage.createMethodCall(
+                "org.gnome.Shell",
+                "/org/gnome/Shell",
+                "org.gnome.Shell",
+                "Eval",
+            )
+            msg.setArguments([script])
+            _GNOME_EVAL_MESSAGES[script] = msg
+        reply = QDBusConnection.sessionBus().call(msg)
+        if reply.type() != QDBusMessage.MessageType.ReplyMessage:
+            return False, None
+        args = reply.arguments()
+        if len(args) >= 2 and args[0] is True:
+            return True, str(args[1])
+    except Exception:
+        pass
+    return False, None
+
+
+# Monitor de la ventana con foco si está maximizada (-1 si no), para todos los players.
+_GNOME_FOCUS_MAX_SCRIPT = (
+    "(() => { const w = global.display.focus_window; "
+    "return w && w.get_maximized() === 3 ? w.get_monitor() : -1; })()"
+)
+# Refresco del fondo en GNOME Shell: _updateBackground y, si falla en ese
+# manager, _createBackgroundActor; un solo Eval para ambos.
+_GNOME_BG_REFRESH_SCRIPT = (
+    "try { imports.ui.main.layoutManager._bgManagers.forEach(m => { "
+    "try { m._updateBackground(); } catch(e) { try { m._createBackgroundActor(); } catch(e2) {} } "
+    "}); true; } catch(e) { false; }"
+)
+_GNOME_FOCUS_CACHE = {"result": (False, -1), "timestamp": float("-inf"), "ttl": 0.5}
+
+
+def _gnome_focus_maximized_monitor() -> tuple[bool, int]:
+    """(ok, monitor) con un único Eval por tick compartido entre players."""
+    now = time.monotonic()
+    if (now - _GNOME_FOCUS_CACHE["timestamp"]) < _GNOME_FOCUS_CACHE["ttl"]:
+        return _GNOME_FOCUS_CACHE["result"]
+    ok, out = _gnome_shell_eval(_GNOME_FOCUS_MAX_SCRIPT)
+    monitor = -1
+    if ok:
+        try:
+            monitor = int(str(out).strip('"'))
+        except (TypeError, ValueError):
+            ok = False
+    result = (ok, monitor)
+    _GNOME_FOCUS_CACHE["result"] = result
+    _GNOME_FOCUS_CACHE["timestamp"] = now
+    return result
+
+
+def _blur_image(img: QImage, radius: float) -> QImage:
+    """Desenfoque gaussiano con QGraphicsBlurEffect (equivalente al gblur de ffmpeg)."""
+    scene = QGraphicsScene()
+    item = QGraphicsPixmapItem(QPixmap.fromImage(img))
+    effect = QGraphicsBlurEffect()
+    effect.setBlurRadius(radius)
+    effect.setBlurHints(QGraphicsBlurEffect.BlurHint.QualityHint)
+    item.setGraphicsEffect(effect)
+    scene.addItem(item)
+
+    out = QImage(img.size(), QImage.Format.Format_RGB32)
+    out.fill(Qt.GlobalColor.black)
+    painter = QPainter(out)
     try:
-        if not directory.exists():
+        scene.render(painter, QRectF(out.rect()), item.boundingRect())
+    finally:
+        painter.end()
+    return out
+
+
+class _StartupState(Enum):
+    """Fases del arranque de VLC en un BackgroundPlayer."""
+    WAIT_VISIBLE = auto()
+    WAIT_XID = auto()
+    WAIT_FRAME = auto()
+    READY = auto()
+
+
+class _TickDispatcher:
+    """Un único QTimer de 2s para los chequeos periódicos de todos los players.
+
+    Evita un par de QTimer por player. Cada player lleva su propio plazo
+    (`_next_screen_check_ts`) para `_check_screen_alive`. Un player se registra
+    al tener la reproducción lista (`_mark_playback_ready`) y sale al reiniciar
+    o cerrarse; sin players registrados el timer se detiene.
+    """
+    INTERVAL_MS = 2000
+
+    _timer: QTimer | None = None
+    _players: "weakref.WeakSet[BackgroundPlayer]" = weakref.WeakSet()
+
+    @classmethod
+    def register(cls, player: "BackgroundPlayer") -> None:
+        cls._players.add(player)
+        if cls._timer is None:
+            cls._timer = QTimer(QCoreApplication.instance())
+            cls._timer.timeout.connect(cls._tick)
+        if not cls._timer.isActive():
+            cls._timer.start(cls.INTERVAL_MS)
+
+    @classmethod
+    def unregister(cls, player: "BackgroundPlayer") -> None:
+        cls._players.discard(player)
+
+    @classmethod
+    def _tick(cls) -> None:
+        if not cls._players:
+            cls._timer.stop()
             return
-        
-        now = time.time()
-        count = 0
-        for file in directory.glob(f"{GNOME_WALLPAPER_BASENAME}-*.jpg"):
+        now = time.monotonic()
+        # Copia: _check_screen_alive puede cerrar un player y closeEvent lo da de baja.
+        for player in list(cls._players):
+            if now >= player._next_screen_check_ts:
+                player._next_screen_check_ts = now + player._screen_check_interval_s
+                try:
+                    player._check_screen_alive()
+                except Exception as e:
+                    _log(f"Error en chequeo de pantalla {getattr(player, 'screen_index', '?')}: {e}")
             try:
-                if (now - file.stat().st_mtime) > max_age_seconds:
-                    file.unlink()
-                    count += 1
+                player._watchdog()
             except Exception:
                 pass
-        
-        if count > 0:
-            _log(f"Cleanup: eliminados {count} snapshots viejos de {directory}")
-    except Exception as e:
-        _log(f"Error en cleanup de snapshots: {e}")
+            if player._max_check_active:
+                try:
+                    player._check_maximized_window()
+                except Exception as e:
+                    _log(f"Error en chequeo de maximizado {getattr(player, 'screen_index', '?')}: {e}")
+
 
 class BackgroundPlayer(QWidget):
+    # Los callbacks de libVLC corren en su hilo: emitir esta señal los encola al hilo Qt.
+    _vlc_event = Signal(int)
+    # Primer frame (o reinicio) listo; lo usa la sincronización con GNOME.
+    playback_ready = Signal()
+    # Sin MediaPlayerTimeChanged durante este tiempo (y en Playing) -> reinicio.
+    WATCHDOG_STALL_S = 6.0
+    STARTUP_PAUSE_TIMEOUT_MS = 3000
+    STARTUP_TICK_MS = 100
+    STARTUP_MAX_ATTEMPTS = 20
+    # Reaplicar el aspect ratio tras el primer frame (VLC lo resetea a veces).
+    ASPECT_FIX_DELAYS_MS = (250, 750, 1500)
+    # Ticks de _check_maximized_window entre consultas forzadas aunque no haya eventos.
+    MAX_CHECK_FORCE_EVERY = 5
+
     def __init__(
         self,
         video_path: str,
@@ -482,6 +1279,9 @@ class BackgroundPlayer(QWidget):
     ):
         super().__init__()
         self.video_path = video_path
+        self._video_exists: bool | None = None  # ver _video_available
+        # capture_frame corre en un hilo de trabajo: protege a _vlc_player de release().
+        self._snapshot_lock = threading.Lock()
         self.pause_on_max = pause_on_max
         self.screen_index = screen_index
         self.volume = int(volume)
@@ -490,7 +1290,6 @@ class BackgroundPlayer(QWidget):
         self._start_position = start_position
         self.speed = 1.0
 
-        self._xprop_failed_count = 0
         self.screen_name = None
         self.is_suspended = False
 
@@ -501,27 +1300,8 @@ class BackgroundPlayer(QWidget):
         
         self._xprop_cache = (None, 0.0)  
         self._xprop_cache_ttl_ms = 2000  
-        
-        # Cache adicional para _NET_WM_STATE: más agresivo (5s)
-        self._wm_state_cache = (None, 0.0)  # (is_maximized, timestamp)
-        self._wm_state_cache_ttl_ms = 5000  # 5s TTL
-
-        self.gnome_interface = QDBusInterface(
-    "org.gnome.Shell",
-    "/org/gnome/Shell",
-    "org.gnome.Shell",
-    QDBusConnection.sessionBus()
-)
 
-        if XLIB_AVAILABLE:
-            try:
-                self._x11_detector = X11WindowDetector()
-                if self._x11_detector.display is None:
-                    self._x11_detector = None
-            except Exception:
-                self._x11_detector = None
-        else:
-            self._x11_detector = None
+        self._x11_detector = _get_shared_x11_detector()
 
         self._vlc_media: vlc.Media | None = None
         self._vlc_events_attached = False
@@ -530,6 +1310,22 @@ class BackgroundPlayer(QWidget):
         self._vlc_restart_count_reset_timer: QTimer | None = None
         self._vlc_restart_backoff_ms = 500
         self._vlc_stable_timer: QTimer | None = None
+        # EndReached llega en el hilo de VLC: se rearma este timer (hilo Qt) vía invokeMethod.
+        self._end_check_timer = QTimer(self)
+        self._end_check_timer.setSingleShot(True)
+        self._end_check_timer.setInterval(200)
+        self._end_check_timer.timeout.connect(self._on_end_check)
+        self._restart_on_error = functools.partial(self._restart_vlc_playback, "error")
+        self._vlc_event.connect(self._handle_vlc_event)
+        self._last_time_changed = time.monotonic()
+        self._pause_on_first_frame = False
+        self._playing_logged = False
+        # Inicio de VLC: un timer reutilizable en lugar de singleShots encadenados.
+        self._startup_state: _StartupState | None = None
+        self._startup_attempts = 0
+        self._startup_timer = QTimer(self)
+        self._startup_timer.setInterval(self.STARTUP_TICK_MS)
+        self._startup_timer.timeout.connect(self._startup_step)
         self._playback_ready = False
         self._pause_on_max_enabled = bool(pause_on_max)
 
@@ -538,7 +1334,7 @@ class BackgroundPlayer(QWidget):
 
         self._crop_retry = 0
         self._crop_timer: QTimer | None = None
-        self._last_crop: str | None = None
+        self._last_crop_key: tuple[int, int] | None = None
 
         self._startup_pause_pending = bool(paused)
 
@@ -546,21 +1342,27 @@ class BackgroundPlayer(QWidget):
 
         self._setup_window()
 
-        self.screen_timer = QTimer(self)
-        self.screen_timer.timeout.connect(self._check_screen_alive)
+        # Chequeos periódicos vía _TickDispatcher (un timer para todo el proceso);
+        # el player se registra en _mark_playback_ready, no antes.
+        self._screen_check_interval_s = 30.0
+        self._next_screen_check_ts = 0.0
         self._update_screen_timer_interval()
-        self.screen_timer.start()
 
-        self.monitor_timer: QTimer | None = None
+        # Se activa cuando la reproducción está lista (ver _mark_playback_ready).
+        self._max_check_active = False
         self._check_count = 0
-        if self._pause_on_max_enabled:
-            self.monitor_timer = QTimer(self)
-            self.monitor_timer.timeout.connect(self._check_maximized_window)
+        self._seen_window_epoch: int | None = None
+
+    def closeEvent(self, event):
+        _TickDispatcher.unregister(self)
+        self._startup_timer.stop()
+        super().closeEvent(event)
 
     def _update_screen_timer_interval(self) -> None:
-        """Ajusta el intervalo del timer según si está en idle o no."""
-        interval_ms = 30000 if self._idle_mode else 10000
-        self.screen_timer.setInterval(interval_ms)
+        """Ajusta el intervalo del chequeo de pantalla según si está en idle o no."""
+        # Los cambios reales llegan por eventos (WallpaperService._on_layout_event).
+        self._screen_check_interval_s = 60.0 if self._idle_mode else 30.0
+        self._next_screen_check_ts = time.monotonic() + self._screen_check_interval_s
 
     def _mark_activity(self) -> None:
         """Marca actividad visible y sale del modo idle si es necesario."""
@@ -595,7 +1397,7 @@ class BackgroundPlayer(QWidget):
             self._update_screen_timer_interval()
 
     def _get_active_window_cached(self) -> str | None:
-        """Retorna active window ID desde xprop, con caché de 2s."""
+        """Retorna active window ID (Xlib, o xprop -spy si Xlib no arrancó), con caché de 2s."""
         now = time.time() * 1000
         cached_result, cached_time = self._xprop_cache
         
@@ -603,21 +1405,17 @@ class BackgroundPlayer(QWidget):
         if cached_result is not None and (now - cached_time) < self._xprop_cache_ttl_ms:
             return cached_result
         
-        try:
-            res = subprocess.check_output(
-                ["xprop", "-root", "_NET_ACTIVE_WINDOW"],
-                stderr=subprocess.DEVNULL,
-                timeout=0.4
-            ).decode()
-            if "window id #" in res:
-                wid = res.split("#")[1].split(",")[0].strip()
-                self._xprop_cache = (wid, now)
-                return wid
-        except Exception:
-            pass
-        
-        self._xprop_cache = (None, now)
-        return None
+        if self._x11_detector is not None:
+            # Un round-trip sobre la conexión ya abierta, sin fork/exec.
+            win_id = self._x11_detector.active_window_id()
+            wid = hex(win_id) if win_id is not None else None
+            self._xprop_cache = (wid, now)
+            return wid
+
+        spy = _get_shared_xprop_spy()
+        wid = spy.active_wid if spy is not None else None
+        self._xprop_cache = (wid, now)
+        return wid
 
     def _reapply_speed(self) -> None:
         """Reaplicar velocidad actual tras eventos de lifecycle.
@@ -708,18 +1506,7 @@ class BackgroundPlayer(QWidget):
         if pause_on_max is not None:
             self.pause_on_max = bool(pause_on_max)
             self._pause_on_max_enabled = bool(pause_on_max)
-            if self._pause_on_max_enabled:
-                if self.monitor_timer is None:
-                    self.monitor_timer = QTimer(self)
-                    self.monitor_timer.timeout.connect(self._check_maximized_window)
-                if not self.monitor_timer.isActive():
-                    self.monitor_timer.start(2000)
-            else:
-                try:
-                    if self.monitor_timer is not None and self.monitor_timer.isActive():
-                        self.monitor_timer.stop()
-                except Exception:
-                    pass
+            self._max_check_active = self._pause_on_max_enabled and self._playback_ready
 
         if paused is not None:
             self.paused = bool(paused)
@@ -813,6 +1600,12 @@ class BackgroundPlayer(QWidget):
         if self._vlc_instance is None:
             raise RuntimeError("libVLC no está inicializado (vlc_instance=None)")
         self._vlc_player = self._vlc_instance.media_player_new()
+        # Método ligado una sola vez para los chequeos periódicos (ver _vlc_state).
+        self._vlc_get_state = self._vlc_player.get_state
+
+    def _vlc_state(self) -> int:
+        """Estado de libVLC como entero (comparable con _VLC_STATE_*)."""
+        return self._vlc_get_state().value
 
     def _attach_vlc_events(self):
         if self._vlc_player is None or self._vlc_events_attached:
@@ -820,33 +1613,28 @@ class BackgroundPlayer(QWidget):
         try:
             em = self._vlc_player.event_manager()
 
-            def _on_end(event):
-                def _check_and_restart():
-                    if self._vlc_player is None:
-                        return
-                    st = self._vlc_player.get_state()
-                    if str(st).lower().endswith(("ended", "stopped")):
-                        self._restart_vlc_playback("end-reached")
-                QTimer.singleShot(200, _check_and_restart)
-
-            def _on_error(event):
-                QTimer.singleShot(0, lambda: self._restart_vlc_playback("error"))
+            try:
+                em.event_attach(vlc.EventType.MediaPlayerEndReached, self._on_vlc_end)
+            except Exception:
+                pass
 
             try:
-                em.event_attach(vlc.EventType.MediaPlayerEndReached, _on_end)
+                em.event_attach(vlc.EventType.MediaPlayerEncounteredError, self._on_vlc_error)
             except Exception:
                 pass
 
             try:
-                em.event_attach(vlc.EventType.MediaPlayerEncounteredError, _on_error)
+                em.event_attach(vlc.EventType.MediaPlayerPlaying, self._on_vlc_playing)
             except Exception:
                 pass
 
-            def _on_playing(event):
-                QTimer.singleShot(100, self._force_aspect_ratio)
+            try:
+                em.event_attach(vlc.EventType.MediaPlayerVout, self._on_vlc_vout)
+            except Exception:
+                pass
 
             try:
-                em.event_attach(vlc.EventType.MediaPlayerPlaying, _on_playing)
+                em.event_attach(vlc.EventType.MediaPlayerTimeChanged, self._on_vlc_time_changed)
             except Exception:
                 pass
 
@@ -854,6 +1642,76 @@ class BackgroundPlayer(QWidget):
         except Exception as e:
             _log(f"ERROR adjuntando eventos VLC: {e}")
 
+    # Callbacks de eventos VLC (hilo de libVLC): métodos ligados, sin closures por evento.
+    def _on_vlc_end(self, event):
+        QMetaObject.invokeMethod(self._end_check_timer, "start", Qt.ConnectionType.QueuedConnection)
+
+    def _on_vlc_error(self, event):
+        self._vlc_event.emit(_VLC_EV_ERROR)
+
+    def _on_vlc_playing(self, event):
+        self._vlc_event.emit(_VLC_EV_PLAYING)
+
+    def _on_vlc_vout(self, event):
+        try:
+            if event.u.new_count <= 0:
+                return
+        except Exception:
+            pass
+        self._vlc_event.emit(_VLC_EV_VOUT)
+
+    def _on_vlc_time_changed(self, event):
+        # Muy frecuente: solo se apunta la hora, sin cruzar al hilo Qt.
+        self._last_time_changed = time.monotonic()
+
+    def _handle_vlc_event(self, ev: int):
+        """Eventos de libVLC ya en el hilo Qt."""
+        if ev == _VLC_EV_ERROR:
+            self._video_exists = None  # el fichero pudo desaparecer: volver a comprobar
+            self._restart_on_error()
+        elif ev == _VLC_EV_PLAYING:
+            QTimer.singleShot(100, self._force_aspect_ratio)
+            if _LOG_DEBUG and not self._playing_logged:
+                self._playing_logged = True
+                self._log_playback_state("playing")
+        elif ev == _VLC_EV_VOUT:
+            # Primer frame: reproducción lista (y pausa de arranque si se pidió).
+            self._startup_state = _StartupState.READY
+            self._mark_playback_ready()
+            if self._pause_on_first_frame:
+                self._pause_on_first_frame = False
+                self._suspend_video()
+
+    def _pause_on_first_frame_timeout(self):
+        if not self._pause_on_first_frame:
+            return
+        _log("ADVERTENCIA: timeout esperando primer frame; pausando de todos modos")
+        self._pause_on_first_frame = False
+        self._mark_playback_ready()
+        self._suspend_video()
+
+    def _log_playback_state(self, tag: str):
+        # Los getters de libVLC solo se llaman si la traza se va a escribir.
+        if not _LOG_DEBUG:
+            return
+        try:
+            if self._vlc_player is None:
+                return
+            vw, vh = self._get_video_size()
+            _log_debug(
+                "VLC state(%s)=%s time=%s len=%s size=%dx%d",
+                tag, self._vlc_player.get_state(), self._vlc_player.get_time(),
+                self._vlc_player.get_length(), vw, vh,
+            )
+        except Exception as e:
+            _log(f"ERROR leyendo estado VLC ({tag}): {e}")
+
+    def _on_end_check(self):
+        if self._vlc_player is None:
+            return
+        if self._vlc_state() in _VLC_STATES_FINISHED:
+            self._restart_vlc_playback("end-reached")
+
     def _set_vlc_media(self):
         if self._vlc_instance is None or self._vlc_player is None: return
         media = self._vlc_instance.media_new(self.video_path)
@@ -872,6 +1730,7 @@ class BackgroundPlayer(QWidget):
         if self._playback_ready:
             return
         self._playback_ready = True
+        self._last_time_changed = time.monotonic()
 
         if self._vlc_stable_timer is None:
             self._vlc_stable_timer = QTimer(self)
@@ -881,9 +1740,8 @@ class BackgroundPlayer(QWidget):
                 try:
                     if self._vlc_player is None:
                         return
-                    st = self._vlc_player.get_state()
                     t = int(self._vlc_player.get_time() or 0)
-                    if t > 0 and str(st).lower().endswith("playing"):
+                    if t > 0 and self._vlc_state() == _VLC_STATE_PLAYING:
                         self._vlc_restart_count = 0
                         self._vlc_restart_backoff_ms = 500
                         _log("VLC: reproducción estable detectada; reset backoff")
@@ -895,8 +1753,9 @@ class BackgroundPlayer(QWidget):
         if not self._vlc_stable_timer.isActive():
             self._vlc_stable_timer.start(3000)
 
-        if self._pause_on_max_enabled and self.monitor_timer is not None and not self.monitor_timer.isActive():
-            self.monitor_timer.start(2000)
+        self._max_check_active = self._pause_on_max_enabled
+        _TickDispatcher.register(self)
+        self.playback_ready.emit()
 
     def _restart_vlc_playback(self, reason: str):
         if self._vlc_player is None or getattr(self, "_vlc_restart_in_progress", False):
@@ -904,88 +1763,114 @@ class BackgroundPlayer(QWidget):
 
         self._vlc_restart_in_progress = True
         self._playback_ready = False
+        # Fuera del tick hasta el siguiente Vout (_mark_playback_ready).
+        _TickDispatcher.unregister(self)
         _log(f"VLC: Hard Reset por {reason}")
 
-        def _do_restart():
-            try:
-                if self._vlc_player is None: return
-                self._vlc_player.stop()
+        QTimer.singleShot(300, self._do_restart_vlc)
+
+    def _do_restart_vlc(self):
+        try:
+            if self._vlc_player is None: return
+            self._vlc_player.stop()
 
-                self._last_crop = None
+            self._last_crop_key = None
 
-                self._set_vlc_media() 
-                self._vlc_player.play()
+            self._set_vlc_media() 
+            self._vlc_player.play()
+            
+            if self.is_suspended:
+                QTimer.singleShot(100, self._repause_if_suspended)
                 
-                if self.is_suspended:
-                    QTimer.singleShot(100, lambda: self._vlc_player.set_pause(1))
-                    
-            finally:
-                self._vlc_restart_in_progress = False
+        finally:
+            self._vlc_restart_in_progress = False
 
-        QTimer.singleShot(300, _do_restart)
+    def _repause_if_suspended(self):
+        if self._vlc_player is not None and self.is_suspended:
+            self._vlc_player.set_pause(1)
+
+    def _video_available(self) -> bool:
+        """¿Existe el video? Un solo stat por player; un error de VLC lo invalida."""
+        if self._video_exists is None:
+            self._video_exists = os.path.exists(self.video_path)
+        return self._video_exists
 
     def _start_vlc(self):
-        if not os.path.exists(self.video_path):
+        """Arranca la secuencia de inicio de VLC (idempotente mientras está en curso)."""
+        if not self._video_available():
             _log(f"ERROR: El archivo de video no existe: {self.video_path}")
             return
-
-        if not self.isVisible():
-            tries = getattr(self, "_start_vlc_visible_tries", 0)
-            if tries < 20:
-                setattr(self, "_start_vlc_visible_tries", tries + 1)
-                QTimer.singleShot(100, self._start_vlc)
-            else:
-                _log("ERROR: ventana no visible tras varios intentos; no se inicializa VLC")
+        if self._startup_timer.isActive():
             return
-
-        self._ensure_vlc_player()
-
-        # Evitar VLC flotante: si no estamos en backend X11 (xcb), no podemos incrustar.
-        try:
-            platform = (QGuiApplication.platformName() or "").lower()
-        except Exception:
-            platform = ""
-        if platform and platform != "xcb":
-            _log(f"VLC: embedding no soportado en Qt platform='{platform}'. Se omite inicio para evitar ventana flotante.")
-            return
-
-        if getattr(self, "_vlc_xwindow_set", False) is not True:
-            tries = getattr(self, "_start_vlc_xid_tries", 0)
-            if tries >= 20:
-                _log("ERROR: no se pudo setear XWindow para VLC tras varios intentos")
+        self._startup_state = _StartupState.WAIT_VISIBLE
+        self._startup_attempts = 0
+        self._startup_timer.start()
+        self._startup_step()
+
+    def _startup_retry(self, error: str) -> None:
+        self._startup_attempts += 1
+        if self._startup_attempts >= self.STARTUP_MAX_ATTEMPTS:
+            _log(f"ERROR: {error}")
+            self._startup_timer.stop()
+            self._startup_state = None
+
+    def _startup_step(self) -> None:
+        """Un paso de la máquina de estados de inicio (lo llama `_startup_timer`)."""
+        state = self._startup_state
+        if state is _StartupState.WAIT_VISIBLE:
+            if not self.isVisible():
+                self._startup_retry("ventana no visible tras varios intentos; no se inicializa VLC")
                 return
-            setattr(self, "_start_vlc_xid_tries", tries + 1)
 
-            def _set_xid_later():
-                try:
-                    if not self.isVisible() or self._vlc_player is None:
-                        QTimer.singleShot(100, self._start_vlc)
-                        return
-                    # Esperar a que el servidor gráfico haya creado el XID real.
-                    if self.windowHandle() is not None:
-                        try:
-                            if not self.windowHandle().isExposed():
-                                QTimer.singleShot(50, self._start_vlc)
-                                return
-                        except Exception:
-                            pass
-
-                    xid = int(self.winId())
-                    if xid == 0:
-                        QTimer.singleShot(50, self._start_vlc)
-                        return
+            self._ensure_vlc_player()
 
-                    self._vlc_player.set_xwindow(xid)
-                    setattr(self, "_vlc_xwindow_set", True)
-                    _log(f"VLC: set_xwindow OK xid={xid}")
-                    QTimer.singleShot(0, self._start_vlc)
-                except Exception as e:
-                    _log(f"ERROR: No se pudo setear XWindow para VLC: {e}")
-                    QTimer.singleShot(150, self._start_vlc)
+            # Evitar VLC flotante: si no estamos en backend X11 (xcb), no podemos incrustar.
+            platform = _qt_platform()
+            if platform and platform != "xcb":
+                _log(f"VLC: embedding no soportado en Qt platform='{platform}'. Se omite inicio para evitar ventana flotante.")
+                self._startup_timer.stop()
+                self._startup_state = None
+                return
 
-            QTimer.singleShot(100, _set_xid_later)
+            if getattr(self, "_vlc_xwindow_set", False) is not True:
+                self._startup_state = _StartupState.WAIT_XID
+                self._startup_attempts = 0
+                return
+        elif state is _StartupState.WAIT_XID:
+            if not self.isVisible() or self._vlc_player is None:
+                self._startup_retry("no se pudo setear XWindow para VLC tras varios intentos")
+                return
+            # Esperar a que el servidor gráfico haya creado el XID real.
+            handle = self.windowHandle()
+            try:
+                if handle is not None and not handle.isExposed():
+                    self._startup_retry("no se pudo setear XWindow para VLC tras varios intentos")
+                    return
+            except Exception:
+                pass
+            try:
+                xid = self._native_wid()
+                if xid == 0:
+                    self._startup_retry("no se pudo setear XWindow para VLC tras varios intentos")
+                    return
+                self._vlc_player.set_xwindow(xid)
+                setattr(self, "_vlc_xwindow_set", True)
+                _log(f"VLC: set_xwindow OK xid={xid}")
+            except Exception as e:
+                _log(f"ERROR: No se pudo setear XWindow para VLC: {e}")
+                self._startup_retry("no se pudo setear XWindow para VLC tras varios intentos")
+                return
+        else:
+            self._startup_timer.stop()
             return
 
+        # Ventana visible y XID asignado: a reproducir. El primer frame
+        # (MediaPlayerVout) pasa el estado a READY.
+        self._startup_timer.stop()
+        self._startup_state = _StartupState.WAIT_FRAME
+        self._play_vlc()
+
+    def _play_vlc(self):
         self._attach_vlc_events()
         self._set_vlc_media()
 
@@ -1001,18 +1886,10 @@ class BackgroundPlayer(QWidget):
         # Hacer ventana completamente visible - sin animación en Wayland
         self.setWindowOpacity(1.0)
         
-        # Forzar ventana al fondo repetidamente
-        for i in range(50):
-            QTimer.singleShot(i * 50, self.lower)
-        
-        # Continuar forzando al fondo
-        def keep_lowering():
-            if self.isVisible():
-                self.lower()
-        
-        self._lower_timer = QTimer(self)
-        self._lower_timer.timeout.connect(keep_lowering)
-        self._lower_timer.start(500)
+        # Forzar ventana al fondo mientras el compositor la mapea (~2.5s). Una
+        # ventana tipo DESKTOP + _NET_WM_STATE_BELOW no necesita bajarse siempre;
+        # _check_screen_alive la vuelve a bajar en cada chequeo por si acaso.
+        self._lower_burst(10, 250)
 
         try:
             rc = self._vlc_player.play()
@@ -1026,129 +1903,95 @@ class BackgroundPlayer(QWidget):
         
         if self._startup_pause_pending:
             self._startup_pause_pending = False
+            # La pausa la aplica el evento MediaPlayerVout (primer frame).
+            self._pause_on_first_frame = True
+            QTimer.singleShot(self.STARTUP_PAUSE_TIMEOUT_MS, self._pause_on_first_frame_timeout)
 
-            def _pause_when_ready(tries: int = 0):
-                try:
-                    if self._vlc_player is None:
-                        return
-                    st = self._vlc_player.get_state()
-                    t = int(self._vlc_player.get_time() or 0)
-                    vw, vh = self._get_video_size()
-
-                    if str(st).lower().endswith("ended"):
-                        self._restart_vlc_playback("ended-during-startup")
-                        if tries < 40:
-                            QTimer.singleShot(150, lambda: _pause_when_ready(tries + 1))
-                        return
-
-                    
-                    if (vw > 0 and vh > 0 and t > 0) or str(st).lower().endswith("playing"):
-                        self._mark_playback_ready()
-                        self._suspend_video()
-                        return
-
-                    if tries < 20:
-                        QTimer.singleShot(150, lambda: _pause_when_ready(tries + 1))
-                    else:
-                    
-                        _log("ADVERTENCIA: timeout esperando primer frame; pausando de todos modos")
-                        self._mark_playback_ready()
-                        self._suspend_video()
-                except Exception as e:
-                    _log(f"ERROR esperando primer frame para pausar: {e}")
-
-            QTimer.singleShot(150, _pause_when_ready)
-
-        def _log_playback_state(tag: str):
-            try:
-                if self._vlc_player is None:
-                    return
-                st = self._vlc_player.get_state()
-                t = self._vlc_player.get_time()
-                l = self._vlc_player.get_length()
-                vw, vh = self._get_video_size()
-                _log(f"VLC state({tag})={st} time={t} len={l} size={vw}x{vh}")
-            except Exception as e:
-                _log(f"ERROR leyendo estado VLC ({tag}): {e}")
-
-        QTimer.singleShot(500, lambda: _log_playback_state("0.5s"))
-        QTimer.singleShot(1500, lambda: _log_playback_state("1.5s"))
-
-        
     def _watchdog(self):
-        try:
-            if self._vlc_player is None: return
-            
-            st = self._vlc_player.get_state()
-            t = int(self._vlc_player.get_time() or 0)
-            length = int(self._vlc_player.get_length() or 0)
+        """Detecta el reloj clavado (Playing sin MediaPlayerTimeChanged).
 
-            
-            if str(st).lower().endswith(("ended", "stopped")):
-                _log(f"Watchdog: Estado {st} detectado. Reviviendo video.")
-                self._restart_vlc_playback("state-ended-recovery")
-                return
-
-            
-            if self.is_suspended: return
-            
-            
-            if length > 0 and t >= (length - 150):
-                _log(f"Watchdog: Fin de tiempo detectado ({t}/{length}ms). Reiniciando...")
-                self._restart_vlc_playback("time-limit-reached")
-                return
-
-            
-            if str(st).lower().endswith("playing") and t == 0:
-                clock_zero = getattr(self, "_watchdog_stuck_zero", 0) + 1
-                setattr(self, "_watchdog_stuck_zero", clock_zero)
-                if clock_zero > 3: 
-                    _log("Watchdog: Reloj clavado en 0ms. Hard Reset.")
-                    self._restart_vlc_playback("stuck-at-zero")
-                    setattr(self, "_watchdog_stuck_zero", 0)
-            else:
-                setattr(self, "_watchdog_stuck_zero", 0)
-                
+        Fin de stream y errores llegan como eventos de libVLC; aquí solo se
+        consulta a VLC cuando hace WATCHDOG_STALL_S que no avanza el tiempo.
+        """
+        if self._vlc_player is None or self.is_suspended or not self._playback_ready:
+            return
+        if (time.monotonic() - self._last_time_changed) < self.WATCHDOG_STALL_S:
+            return
+        try:
+            if self._vlc_state() == _VLC_STATE_PLAYING:
+                _log("Watchdog: Reloj clavado (sin TimeChanged). Hard Reset.")
+                self._last_time_changed = time.monotonic()
+                self._restart_vlc_playback("stuck-at-zero")
         except Exception as e:
             _log(f"ERROR en watchdog: {e}")
 
-    def snapshot_to_file(self, path: Path, width: int, height: int) -> bool:
-        """Toma snapshot usando ffmpeg."""
-        if self._vlc_player is None or not os.path.exists(self.video_path):
-            return False
-        
-        try:
-            path.parent.mkdir(parents=True, exist_ok=True)
+    def capture_frame(self, scratch_png: Path, width: int, height: int) -> QImage | None:
+        """Frame actual escalado, sin blur; None si no se pudo.
+
+        Apto para un hilo de trabajo: solo usa libVLC (bajo `_snapshot_lock`,
+        que `_stop_player` toma antes de liberar el player), ffmpeg y QImage;
+        nunca QPixmap. El blur (`_blur_image`) va en el hilo Qt.
+        """
+        if not self._video_available():
+            return None
+        with self._snapshot_lock:
+            if self._vlc_player is None:
+                return None
+            img = self._snapshot_from_vlc(scratch_png, width, height)
+            if img is not None:
+                return img
             current_time_ms = self._vlc_player.get_time()
+
+        try:
             timestamp = max(0, current_time_ms / 1000.0)
 
+            # ffmpeg solo decodifica y escala (BMP por stdout, sin fichero
+            # intermedio); el blur es el mismo paso en Qt que con VLC.
             cmd = [
-                "ffmpeg", "-y",
+                "ffmpeg", "-v", "error",
                 "-ss", str(timestamp), 
                 "-i", self.video_path,
                 "-frames:v", "1",
                 "-an", "-sn",
-                
-                "-vf", f"scale={width}:{height},gblur=sigma=5:steps=3,eq=saturation=1.1",
-                "-q:v", "2", 
-                "-f", "mjpeg",
-                str(path)
+                "-vf", f"scale={width}:{height}",
+                "-f", "image2pipe", "-c:v", "bmp",
+                "-",
             ]
 
-            
-            subprocess.run(
+            res = subprocess.run(
                 cmd, 
-                stdout=subprocess.DEVNULL, 
+                stdout=subprocess.PIPE, 
                 stderr=subprocess.DEVNULL, 
                 timeout=5
             )
-            
-            return path.exists()
+            img = QImage.fromData(res.stdout, "BMP")
+            return None if img.isNull() else img
             
         except Exception as e:
             _log(f"Error en snapshot: {e}")
-            return False
+            return None
      
+    def _snapshot_from_vlc(self, png_path: Path, width: int, height: int) -> QImage | None:
+        """Frame ya decodificado por libVLC (lo escribe como PNG en `png_path`).
+
+        Evita lanzar ffmpeg, que reabre y decodifica otra vez el video.
+        """
+        try:
+            if self._vlc_state() not in (_VLC_STATE_PLAYING, _VLC_STATE_PAUSED):
+                return None
+            if self._vlc_player.video_take_snapshot(0, str(png_path), width, height) != 0:
+                return None
+            img = QImage(str(png_path))
+            return None if img.isNull() else img
+        except Exception as e:
+            _log(f"Error en snapshot VLC: {e}")
+            return None
+        finally:
+            try:
+                os.unlink(png_path)
+            except OSError:
+                pass
+
     def _get_video_size(self) -> tuple[int, int]:
         if self._vlc_player is None:
             return (0, 0)
@@ -1169,22 +2012,25 @@ class BackgroundPlayer(QWidget):
         if w_w <= 0 or w_h <= 0:
             return
 
+        # Ya aplicado para este tamaño: comparar la tupla, sin formatear.
+        key = (w_w, w_h)
+        if key == self._last_crop_key:
+            return
+
+        try:
+            self._vlc_player.video_set_crop_geometry(None)
+        except Exception:
+            pass
+
         # Forzar aspect ratio a la ventana para evitar barras negras.
         aspect_str = f"{w_w}:{w_h}"
-        
-        if aspect_str != self._last_crop:
-            try:
-                self._vlc_player.video_set_crop_geometry(None)
-            except Exception:
-                pass
-            
-            try:
-                self._vlc_player.video_set_aspect_ratio(aspect_str)
-                self._vlc_player.video_set_scale(0) # 0 = Ajustar a ventana
-                self._last_crop = aspect_str
-                _log(f"Aspect Ratio forzado a ventana: {aspect_str}")
-            except Exception as e:
-                _log(f"ERROR aplicando aspect ratio: {e}")
+        try:
+            self._vlc_player.video_set_aspect_ratio(aspect_str)
+            self._vlc_player.video_set_scale(0) # 0 = Ajustar a ventana
+            self._last_crop_key = key
+            _log(f"Aspect Ratio forzado a ventana: {aspect_str}")
+        except Exception as e:
+            _log(f"ERROR aplicando aspect ratio: {e}")
 
     def _force_aspect_ratio(self):
         """Fuerza el aspect ratio después de que VLC comience a reproducir.
@@ -1193,19 +2039,31 @@ class BackgroundPlayer(QWidget):
             return
 
         self._crop_retry = 0
-        self._last_crop = None  # Forzar re-aplicación
+        self._last_crop_key = None  # Forzar re-aplicación
         self._apply_crop_if_ready()
 
-        QTimer.singleShot(250, self._delayed_aspect_fix)
-        QTimer.singleShot(750, self._delayed_aspect_fix)
-        QTimer.singleShot(1500, self._delayed_aspect_fix)
+        # Reintentos a 250/750/1500 ms con un único timer que se re-arma.
+        timer = getattr(self, "_aspect_retry_timer", None)
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(self._delayed_aspect_fix)
+            self._aspect_retry_timer = timer
+        self._aspect_retry_step = 0
+        timer.start(self.ASPECT_FIX_DELAYS_MS[0])
 
     def _delayed_aspect_fix(self):
         """Aplicación tardía del crop para casos donde VLC resetea después del primer frame."""
+        step = self._aspect_retry_step + 1
+        self._aspect_retry_step = step
+        delays = self.ASPECT_FIX_DELAYS_MS
+        if step < len(delays):
+            self._aspect_retry_timer.start(delays[step] - delays[step - 1])
+
         if self._vlc_player is None:
             return
 
-        self._last_crop = None
+        self._last_crop_key = None
         self._apply_crop_if_ready()
 
     def _schedule_crop(self, reset: bool = False):
@@ -1296,6 +2154,7 @@ class BackgroundPlayer(QWidget):
         if not self.isVisible() and not (self.windowState() & Qt.WindowState.WindowMinimized):
             _log(f" Ventana {self.screen_index} oculta. Forzando show()")
             self.show()
+        if self.isVisible():
             self.lower()
 
         self._check_idle_status()
@@ -1388,8 +2247,7 @@ class BackgroundPlayer(QWidget):
 
             self.show()
             self.lower()
-            for i in range(5):
-                QTimer.singleShot(i * 300, self.lower)
+            self._lower_burst(5, 300)
 
             if self._vlc_player is None:
                 self._start_vlc()
@@ -1417,8 +2275,7 @@ class BackgroundPlayer(QWidget):
 
             self.show()
             self.lower()
-            for i in range(5):
-                QTimer.singleShot(i * 300, self.lower)
+            self._lower_burst(5, 300)
 
             if self._vlc_player is None:
                 self._start_vlc()
@@ -1440,8 +2297,7 @@ class BackgroundPlayer(QWidget):
 
                 self.show()
                 self.lower()
-                for i in range(5):
-                    QTimer.singleShot(i * 300, self.lower)
+                self._lower_burst(5, 300)
 
                 if self._vlc_player is None:
                     self._start_vlc()
@@ -1460,9 +2316,24 @@ class BackgroundPlayer(QWidget):
         _log(f"Actualizando geometría por cambio en pantalla {self.screen_index}: {geo}")
 
         self._schedule_crop(reset=True)
-
-        for i in range(10):
-            QTimer.singleShot(i * 200, self.lower)
+        self._lower_burst(10, 200)
+
+    def _lower_burst(self, count: int, interval_ms: int) -> None:
+        """Llama a lower() `count` veces cada `interval_ms` con un único timer reutilizable."""
+        timer = getattr(self, "_lower_timer", None)
+        if timer is None:
+            timer = QTimer(self)
+            timer.timeout.connect(self._lower_once)
+            self._lower_timer = timer
+        self._lower_remaining = max(count, getattr(self, "_lower_remaining", 0))
+        timer.start(interval_ms)
+
+    def _lower_once(self) -> None:
+        self._lower_remaining -= 1
+        if self._lower_remaining <= 0:
+            self._lower_timer.stop()
+        if self.isVisible():
+            self.lower()
 
     def changeEvent(self, event):
         if event.type() == QEvent.Type.WindowStateChange:
@@ -1471,14 +2342,28 @@ class BackgroundPlayer(QWidget):
                 QTimer.singleShot(10, self.lower)
         super().changeEvent(event)
 
+    def _native_wid(self) -> int:
+        """XID de la ventana nativa; estable una vez creado, así que se guarda."""
+        wid = getattr(self, "_cached_wid", 0)
+        if not wid:
+            wid = int(self.winId())
+            if wid:
+                self._cached_wid = wid
+        return wid
+
     def _apply_x11_props(self):
+        if _qt_platform() not in ("", "xcb"):
+            return  # Sin ventana X11 (p.ej. Wayland nativo): ni Xlib ni xprop aplican.
+        wid = self._native_wid()
+        if self._x11_detector is not None and wid and self._x11_detector.set_desktop_window_props(wid):
+            _log(f"Propiedades X11 aplicadas a ventana {wid}")
+            return
+
         if not shutil.which("xprop"):
             _log("ADVERTENCIA: 'xprop' no encontrado. La ventana podría no comportarse como fondo de pantalla.")
             return
 
         try:
-            wid = self.winId()
-
             cmd_type = [
                 "xprop",
                 "-id",
@@ -1490,10 +2375,6 @@ class BackgroundPlayer(QWidget):
                 "_NET_WM_WINDOW_TYPE",
                 "_NET_WM_WINDOW_TYPE_DESKTOP",
             ]
-            res_type = subprocess.run(cmd_type, capture_output=True, text=True)
-            if res_type.returncode != 0:
-                _log(f"Error xprop type: {res_type.stderr}")
-
             cmd_state = [
                 "xprop",
                 "-id",
@@ -1505,9 +2386,15 @@ class BackgroundPlayer(QWidget):
                 "_NET_WM_STATE",
                 "_NET_WM_STATE_SKIP_TASKBAR,_NET_WM_STATE_SKIP_PAGER,_NET_WM_STATE_BELOW,_NET_WM_STATE_STICKY",
             ]
-            res_state = subprocess.run(cmd_state, capture_output=True, text=True)
-            if res_state.returncode != 0:
-                _log(f"Error xprop state: {res_state.stderr}")
+            # Propiedades independientes: ambos xprop en paralelo, una sola espera.
+            procs = [
+                (tag, subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True))
+                for tag, cmd in (("type", cmd_type), ("state", cmd_state))
+            ]
+            for tag, proc in procs:
+                _, err = proc.communicate()
+                if proc.returncode != 0:
+                    _log(f"Error xprop {tag}: {err}")
 
             _log(f"Propiedades X11 aplicadas a ventana {wid}")
         except Exception as e:
@@ -1529,6 +2416,7 @@ class BackgroundPlayer(QWidget):
         if not self.is_suspended:
             return
         self.is_suspended = False
+        self._last_time_changed = time.monotonic()
         try:
             if self._vlc_player is not None:
                 self._vlc_player.set_pause(0)
@@ -1544,19 +2432,25 @@ class BackgroundPlayer(QWidget):
             return
         
         self._check_count = getattr(self, "_check_count", 0) + 1
-        if self._check_count >= 20:
+        if self._check_count >= self.MAX_CHECK_FORCE_EVERY:
             self._check_count = 0
 
+        # Sin eventos de ventana/layout desde el último chequeo nada cambió: se
+        # evita el Eval/D-Bus. Cada MAX_CHECK_FORCE_EVERY ticks se consulta igual
+        # (mover una ventana maximizada de monitor no cambia _NET_WM_STATE).
+        epoch = _window_events_epoch()
+        if epoch is not None and epoch == self._seen_window_epoch and self._check_count:
+            self._apply_maximized_state(self._maximized_active)
+            return
+        self._seen_window_epoch = epoch
+
         is_maximized = False
         method_ok = False
 
         try:
-            script = f"global.display.focus_window && global.display.focus_window.get_monitor() === {self.screen_index} ? global.display.focus_window.get_maximized() : 0"
-            reply = self.gnome_interface.call("Eval", script)
-            
-            if reply.type() == QDBusMessage.MessageType.ReplyMessage:
-                val = str(reply.arguments()[1]).strip('"')
-                is_maximized = (val == "3")
+            ok, monitor = _gnome_focus_maximized_monitor()
+            if ok:
+                is_maximized = (monitor == self.screen_index)
                 method_ok = True
         except:
             method_ok = False
@@ -1568,26 +2462,15 @@ class BackgroundPlayer(QWidget):
                     method_ok = True
                 except: pass
             
-            if not method_ok and self._xprop_failed_count <= 5:
-                try:
-                    # Usar caché de WM_STATE para reducir subprocess calls
-                    now = time.time() * 1000
-                    cached_is_max, cached_time = self._wm_state_cache
-                    
-                    # Si está en caché y no ha expirado, usar valor cacheado
-                    if cached_is_max is not None and (now - cached_time) < self._wm_state_cache_ttl_ms:
-                        is_maximized = cached_is_max
-                    else:
-                        # Hacer consulta fresca
-                        wid = self._get_active_window_cached()
-                        if wid and wid != "0x0":
-                            state = subprocess.check_output(["xprop", "-id", wid, "_NET_WM_STATE"], stderr=subprocess.DEVNULL, timeout=0.4).decode()
-                            is_maximized = "_NET_WM_STATE_MAXIMIZED_VERT" in state and "_NET_WM_STATE_MAXIMIZED_HORZ" in state
-                        self._wm_state_cache = (is_maximized, now)
-                    self._xprop_failed_count = 0
-                except: 
-                    self._xprop_failed_count += 1
+            if not method_ok:
+                # Estado mantenido por `xprop -spy`: sin subprocess por tick.
+                spy = _get_shared_xprop_spy()
+                if spy is not None:
+                    is_maximized = spy.maximized
 
+        self._apply_maximized_state(is_maximized)
+
+    def _apply_maximized_state(self, is_maximized: bool) -> None:
         if is_maximized and not self.is_suspended:
             self._maximized_active = True
             self._suspend_video()
@@ -1600,13 +2483,23 @@ class BackgroundPlayer(QWidget):
 
 
 class WallpaperService(QApplication):
+    # (gen, screen, slot, path, QImage | None) desde el hilo de snapshots; se entrega en el hilo Qt.
+    _gnome_snapshot_ready = Signal(object)
+    # (gen, screen, slot, path, ok) cuando el hilo de snapshots termina el JPG.
+    _gnome_snapshot_saved = Signal(object)
+
     def __init__(self, argv):
         super().__init__(argv)
         self.setApplicationName("KomorebiWallpaperService")
         self.setQuitOnLastWindowClosed(False)
 
         self.players: dict[int, BackgroundPlayer] = {}
-        self._monitor_layout_hash = ""
+        self._monitor_layout_key: tuple | None = None
+        self._layout_key_cache: tuple[list, tuple] | None = None
+        self._last_autoload_sig: tuple | None = None
+        # Fade de sustitución de player: animación reutilizable y creación pendiente por pantalla.
+        self._swap_fade_anims: dict[int, QPropertyAnimation] = {}
+        self._swap_fade_pending: dict[int, object] = {}
 
         try:
             self.vlc_instance = BackgroundPlayer._create_vlc_instance()
@@ -1624,14 +2517,30 @@ class WallpaperService(QApplication):
         self._gnome_wallpaper_source_screen = 0
         self._gnome_wallpaper_last_uri: str | None = None
         self._gnome_wallpaper_current_path: Path | None = None
-        self._gnome_wallpaper_pending_tries = 0
+        # Dos ficheros fijos por pantalla alternados (A/B): la URI cambia en cada
+        # tick (GNOME recarga) y en /dev/shm nunca hay más de dos snapshots.
+        self._gnome_wallpaper_slot = 0
+        self._gnome_wallpaper_paths: set[Path] = set()
+        # Un tick llegó antes del primer frame del player fuente (ver _on_player_playback_ready).
+        self._gnome_wallpaper_waiting = False
+        # Captura en curso en el hilo de snapshots: los ticks no se solapan.
+        self._gnome_snapshot_busy = False
+        # Se incrementa al detener la sync: descarta capturas que lleguen tarde.
+        self._gnome_snapshot_gen = 0
+        self._gnome_snapshot_ready.connect(self._on_gnome_snapshot_ready)
+        self._gnome_snapshot_saved.connect(self._on_gnome_snapshot_saved)
 
         self._gnome_original_picture_uri = None
         self._gnome_original_picture_uri_dark = None
         self._gnome_original_picture_options = None
+        # Las claves -dark dependen de la versión de GNOME: se consultan una vez.
+        self._has_bg_dark_key = False
+        self._has_ss_dark_key = False
         if self._gnome_wallpaper_enabled:
+            self._has_bg_dark_key = _gsettings_has_key("org.gnome.desktop.background", "picture-uri-dark")
+            self._has_ss_dark_key = _gsettings_has_key("org.gnome.desktop.screensaver", "picture-uri-dark")
             self._gnome_original_picture_uri = _gsettings_get("picture-uri")
-            if _gsettings_has_key("org.gnome.desktop.background", "picture-uri-dark"):
+            if self._has_bg_dark_key:
                 self._gnome_original_picture_uri_dark = _gsettings_get("picture-uri-dark")
             self._gnome_original_picture_options = _gsettings_get("picture-options")
 
@@ -1639,14 +2548,25 @@ class WallpaperService(QApplication):
         QLocalServer.removeServer(SERVER_NAME)
 
         self.primary_screen = self.primaryScreen()
-        if self.primary_screen:
-            self.primary_screen.geometryChanged.connect(self._on_global_screen_change)
         self.screenRemoved.connect(self._on_screen_removed)
         self.screenAdded.connect(self._on_screen_added)
 
+        # Cambios de layout por eventos (QScreen + RandR), agrupados en un
+        # single-shot: un hotplug llega como una ráfaga de notificaciones.
+        self._layout_event_timer = QTimer(self)
+        self._layout_event_timer.setSingleShot(True)
+        self._layout_event_timer.setInterval(LAYOUT_EVENT_DEBOUNCE_MS)
+        self._layout_event_timer.timeout.connect(self._on_layout_event)
+        for screen in self.screens():
+            self._watch_screen(screen)
+        _RANDR_STATE["listeners"].append(self._layout_event_timer.start)
+        # Primera consulta: abre la conexión RandR y suscribe a sus eventos.
+        self._monitor_layout_key = self._compute_monitor_layout_key()
+
+        # Red de seguridad por si se pierde algún evento (p.ej. sin RandR 1.5).
         self._layout_monitor_timer = QTimer(self)
         self._layout_monitor_timer.timeout.connect(self._check_layout_changes)
-        self._layout_monitor_timer.start(3000)
+        self._layout_monitor_timer.start(LAYOUT_FALLBACK_INTERVAL_MS)
 
         if self.server.listen(SERVER_NAME):
             _log(f"Servidor iniciado en socket: {SERVER_NAME}")
@@ -1656,91 +2576,135 @@ class WallpaperService(QApplication):
 
         QTimer.singleShot(0, self._autoload_from_config)
 
-    def _compute_monitor_layout_hash(self) -> str:
+    def _compute_monitor_layout_key(self) -> tuple:
+        """Layout actual como tupla comparable (name, x, y, w, h) por índice; sin hash.
+
+        Mientras `_xrandr_monitors` devuelva la misma lista cacheada (no hubo
+        refresco), la tupla anterior sigue valiendo: ráfagas de eventos de
+        hotplug no la recalculan.
+        """
+        xmon = _xrandr_monitors(force_refresh=False)
+        cached = self._layout_key_cache
+        if xmon and cached is not None and cached[0] is xmon:
+            return cached[1]
         inv = _current_monitor_inventory()
-        layout_str = "|".join([
-            f"{m.get('name', '')}:{m.get('x', 0)},{m.get('y', 0)},{m.get('w', 0)}x{m.get('h', 0)}"
+        key = tuple(
+            (m.get('name', ''), m.get('x', 0), m.get('y', 0), m.get('w', 0), m.get('h', 0))
             for m in sorted(inv, key=lambda x: x.get('index', 0))
-        ])
-        import hashlib
-        return hashlib.md5(layout_str.encode()).hexdigest()
+        )
+        # Se guarda la lista misma (no id()): un id reciclado no da falsos aciertos.
+        self._layout_key_cache = (xmon, key) if xmon else None
+        return key
+
+    def _watch_screen(self, screen) -> None:
+        screen.geometryChanged.connect(self._layout_event_timer.start)
+        screen.orientationChanged.connect(self._layout_event_timer.start)
+
+    def _on_layout_event(self) -> None:
+        """Geometría/orientación de una pantalla o RandR cambió."""
+        self._check_layout_changes()
+        # _check_screen_alive no toca self.players: no hace falta copiar.
+        for player in self.players.values():
+            try:
+                player._check_screen_alive()
+            except Exception as e:
+                _log(f"Error en chequeo de pantalla {player.screen_index}: {e}")
 
     def _check_layout_changes(self):
-        current_hash = self._compute_monitor_layout_hash()
+        current_key = self._compute_monitor_layout_key()
         
-        if not self._monitor_layout_hash:
-            self._monitor_layout_hash = current_hash
+        if self._monitor_layout_key is None:
+            self._monitor_layout_key = current_key
             return
             
-        if current_hash != self._monitor_layout_hash:
-            _log(f" Layout de monitores cambió: {self._monitor_layout_hash[:8]} -> {current_hash[:8]}")
-            self._monitor_layout_hash = current_hash
+        if current_key != self._monitor_layout_key:
+            _log(f" Layout de monitores cambió: {hash(self._monitor_layout_key) & 0xffffffff:08x} -> {hash(current_key) & 0xffffffff:08x}")
+            self._monitor_layout_key = current_key
             _xrandr_monitors(force_refresh=True)
             self._cleanup_orphaned_players()
             QTimer.singleShot(1500, self._autoload_from_config)
 
     def _cleanup_orphaned_players(self):
         inv = _current_monitor_inventory()
-        valid_indices = {m['index'] for m in inv}
-        valid_names = {m['name'] for m in inv if m.get('name')}
-        
-        to_remove = []
-        for idx, player in list(self.players.items()):
-            if idx not in valid_indices:
-                to_remove.append(idx)
-                continue
-            if player.screen_name and player.screen_name not in valid_names:
-                to_remove.append(idx)
-                continue
+        valid_indices = frozenset(m['index'] for m in inv)
+        valid_names = frozenset(m['name'] for m in inv if m.get('name'))
         
+        # Se materializa antes de _stop_player, que modifica self.players.
+        to_remove = tuple(
+            idx for idx, player in self.players.items()
+            if idx not in valid_indices
+            or (player.screen_name and player.screen_name not in valid_names)
+        )
+
         for idx in to_remove:
             _log(f" Eliminando player huérfano {idx}")
             self._stop_player(idx, persist_disable=False)
 
-    def _resolve_config_entry_to_screen_index(self, entry: dict) -> int | None:
-        entry = _normalize_monitor_entry(entry)
-        inv = _current_monitor_inventory()
-        if not inv:
+    @staticmethod
+    def _resolve_config_entry_to_screen_index(
+        entry: MonitorCfg, inv_len: int, name_to_index: dict[str, int]
+    ) -> int | None:
+        """Índice actual del monitor de `entry`: por nombre y, si no, por índice guardado."""
+        if not inv_len:
             return None
 
-        name = entry.get("screen_name")
+        name = entry.screen_name
         if name:
-            for m in inv:
-                if m.get("name") == name:
-                    return int(m["index"])
+            idx = name_to_index.get(name)
+            if idx is not None:
+                return idx
 
         try:
-            idx = int(entry.get("screen", 0))
+            idx = int(entry.screen)
         except Exception:
             idx = 0
-        if 0 <= idx < len(inv):
+        if 0 <= idx < inv_len:
             return idx
         return None
 
+    def _autoload_signature(self) -> tuple | None:
+        """(mtime de la config, layout, players vivos); None si hay config sin escribir."""
+        if _CONFIG_SAVE_STATE["pending"] is not None:
+            return None
+        try:
+            mtime = os.stat(CONFIG_PATH).st_mtime_ns
+        except OSError:
+            mtime = None
+        return (mtime, self._compute_monitor_layout_key(), frozenset(self.players))
+
     def _autoload_from_config(self):
+        _xrandr_monitors(force_refresh=True)
+        # Ráfagas de hotplug: si ni la config, ni el layout, ni los players
+        # cambiaron desde el último autoload, no hay nada que (re)arrancar.
+        sig = self._autoload_signature()
+        if sig is not None and sig == self._last_autoload_sig:
+            return
+
         data = _load_config()
-        monitors = [_normalize_monitor_entry(m) for m in (data.get("monitors") or []) if isinstance(m, dict)]
+        monitors = data["monitors"]
         if not monitors:
             return
 
-        _xrandr_monitors(force_refresh=True)
         inv = _current_monitor_inventory()
-        valid_indices = {m['index'] for m in inv}
+        # Una sola pasada por el inventario para todas las entradas; los índices
+        # resueltos salen de aquí o de [0, len(inv)), así que siempre existen.
+        name_to_index: dict[str, int] = {}
+        for m in inv:
+            if m.get("name"):
+                name_to_index.setdefault(m["name"], int(m["index"]))
 
         started = 0
+        started_indices: set[int] = set()
         for entry in monitors:
-            if not entry.get("enabled", True):
+            if not entry.enabled:
                 continue
-            video_path = entry.get("video_path")
+            video_path = entry.video_path
             if not video_path or not os.path.exists(str(video_path)):
                 continue
 
-            resolved = self._resolve_config_entry_to_screen_index(entry)
+            resolved = self._resolve_config_entry_to_screen_index(entry, len(inv), name_to_index)
             if resolved is None:
-                continue
-                
-            if resolved not in valid_indices:
-                _log(f" Saltando monitor {resolved}: no existe en layout actual")
+                _log(f" Saltando monitor {entry.screen_name or entry.screen}: no existe en layout actual")
                 continue
 
             if resolved in self.players:
@@ -1750,12 +2714,17 @@ class WallpaperService(QApplication):
             self._start_player(
                 str(video_path),
                 int(resolved),
-                bool(entry.get("pause_on_max", False)),
-                int(entry.get("volume", 0)),
-                bool(entry.get("paused", False)),
+                bool(entry.pause_on_max),
+                int(entry.volume),
+                bool(entry.paused),
                 persist=False,
             )
             started += 1
+            started_indices.add(int(resolved))
+
+        if sig is not None:
+            # Players recién pedidos cuentan como vivos (el alta puede ser diferida).
+            self._last_autoload_sig = sig[:2] + (frozenset(self.players) | started_indices,)
 
         if started:
             _log(f"✅ Autoload: {started} player(s) iniciados")
@@ -1765,9 +2734,10 @@ class WallpaperService(QApplication):
             _log(f"➕ Pantalla conectada: {screen.name()}")
         except Exception:
             _log("➕ Pantalla conectada")
-        
+        self._watch_screen(screen)
+
         _xrandr_monitors(force_refresh=True)
-        self._monitor_layout_hash = self._compute_monitor_layout_hash()
+        self._monitor_layout_key = self._compute_monitor_layout_key()
         QTimer.singleShot(2000, self._autoload_from_config)
 
     def _start_gnome_wallpaper_sync(self):
@@ -1792,6 +2762,7 @@ class WallpaperService(QApplication):
             _log("GNOME wallpaper sync: iniciado (static)")
 
     def _stop_gnome_wallpaper_sync(self, restore: bool = True):
+        self._gnome_snapshot_gen += 1
         if self._gnome_wallpaper_timer is not None and self._gnome_wallpaper_timer.isActive():
             self._gnome_wallpaper_timer.stop()
             _log("GNOME wallpaper sync: detenido")
@@ -1803,64 +2774,54 @@ class WallpaperService(QApplication):
             return
         if self._gnome_original_picture_uri:
             _gsettings_set_schema("org.gnome.desktop.background", "picture-uri", self._gnome_original_picture_uri)
-        if self._gnome_original_picture_uri_dark and _gsettings_has_key("org.gnome.desktop.background", "picture-uri-dark"):
+        if self._gnome_original_picture_uri_dark and self._has_bg_dark_key:
             _gsettings_set_schema("org.gnome.desktop.background", "picture-uri-dark", self._gnome_original_picture_uri_dark)
         if self._gnome_original_picture_options:
             _gsettings_set_schema("org.gnome.desktop.background", "picture-options", self._gnome_original_picture_options)
-        try:
-            if self._gnome_wallpaper_current_path and self._gnome_wallpaper_current_path.exists():
-                self._gnome_wallpaper_current_path.unlink()
-        except Exception:
-            pass
+        for path in self._gnome_wallpaper_paths:
+            # También los temporales del slot (.png de VLC, .tmp del JPG) si quedaron.
+            for p in (path, path.with_name(path.name + ".png"), path.with_name(path.name + ".tmp")):
+                try:
+                    os.unlink(p)
+                except OSError:
+                    pass
+        self._gnome_wallpaper_paths.clear()
+        self._gnome_wallpaper_current_path = None
 
     def _request_gnome_wallpaper_update(self, source_screen: int | None = None):
         if not self._gnome_wallpaper_enabled:
             return
         if source_screen is not None:
             self._gnome_wallpaper_source_screen = int(source_screen)
-        self._gnome_wallpaper_pending_tries = 0
         QTimer.singleShot(0, self._tick_gnome_wallpaper)
 
+    def _on_player_playback_ready(self, screen_index: int) -> None:
+        if self._gnome_wallpaper_waiting and screen_index == self._gnome_wallpaper_source_screen:
+            self._tick_gnome_wallpaper()
+
     def _gnome_shell_eval(self, script: str) -> tuple[bool, str | None]:
         """Ejecuta JS en GNOME Shell via DBus Eval (best-effort)."""
-        try:
-            msg = QDBusMessage.createMethodCall(
-                "org.gnome.Shell",
-                "/org/gnome/Shell",
-                "org.gnome.Shell",
-                "Eval",
-            )
-            msg.setArguments([script])
-            reply = QDBusConnection.sessionBus().call(msg)
-            if reply.type() != QDBusMessage.MessageType.ReplyMessage:
-                return False, None
-            args = reply.arguments()
-            if len(args) >= 2 and args[0] is True:
-                return True, str(args[1])
-        except Exception:
-            pass
-        return False, None
+        return _gnome_shell_eval(script)
 
     def _force_gnome_background_refresh(self):
         """Fuerza refresh del background en GNOME Shell (para Overview)."""
-        scripts = [
-            "try { const Main = imports.ui.main; Main.layoutManager._bgManagers.forEach(m => { try { m._updateBackground(); } catch(e) {} }); true; } catch(e) { false; }",
-            "try { const Main = imports.ui.main; Main.layoutManager._bgManagers.forEach(m => { try { m._createBackgroundActor(); } catch(e) {} }); true; } catch(e) { false; }",
-        ]
-        for s in scripts:
-            ok, _ = self._gnome_shell_eval(s)
-            if ok:
-                return
+        self._gnome_shell_eval(_GNOME_BG_REFRESH_SCRIPT)
 
     def _tick_gnome_wallpaper(self):
-        player = self.players.get(self._gnome_wallpaper_source_screen)
-        if player is None and self.players:
-            self._gnome_wallpaper_source_screen = sorted(self.players.keys())[0]
-            player = self.players.get(self._gnome_wallpaper_source_screen)
-        if player is None:
+        # Solo llega aquí con la sync activa: _start_gnome_wallpaper_sync no crea
+        # el timer si está deshabilitada.
+        players = self.players
+        player = players.get(self._gnome_wallpaper_source_screen)
+        if player is None and players:
+            self._gnome_wallpaper_source_screen = min(players)
+            player = players[self._gnome_wallpaper_source_screen]
+        if player is None or player.is_suspended:
             return
-        if player.is_suspended:
+        if not player._playback_ready:
+            # Sin frame todavía: el snapshot se toma al llegar playback_ready.
+            self._gnome_wallpaper_waiting = True
             return
+        self._gnome_wallpaper_waiting = False
 
         geo = player.geometry()
         src_w = max(1, int(geo.width()))
@@ -1871,70 +2832,114 @@ class WallpaperService(QApplication):
         width = max(1, int(src_w * scale))
         height = max(1, int(src_h * scale))
 
-        GNOME_WALLPAPER_DIR.mkdir(parents=True, exist_ok=True)
-        ts = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
-        path = GNOME_WALLPAPER_DIR / f"{GNOME_WALLPAPER_BASENAME}-{ts}.jpg"
+        if self._gnome_snapshot_busy:
+            return
+        if not self._gnome_wallpaper_paths:
+            # Primer snapshot (o tras restaurar): luego el directorio ya existe.
+            GNOME_WALLPAPER_DIR.mkdir(parents=True, exist_ok=True)
+        gen = self._gnome_snapshot_gen
+        screen = self._gnome_wallpaper_source_screen
+        slot = self._gnome_wallpaper_slot ^ 1
+        path = GNOME_WALLPAPER_DIR / f"{GNOME_WALLPAPER_BASENAME}-{screen}-{slot}.jpg"
+
+        # El snapshot de VLC (o ffmpeg, hasta 5 s) bloquea: va a un hilo. El
+        # blur y el JPG usan QPixmap/QGraphicsScene y vuelven al hilo Qt.
+        def _capture():
+            img = None
+            scratch_png = path.with_name(path.name + ".png")
+            try:
+                img = player.capture_frame(scratch_png, width, height)
+            finally:
+                # El QImage ya está en memoria: el PNG de VLC sobra en /dev/shm.
+                try:
+                    os.unlink(scratch_png)
+                except OSError:
+                    pass
+                self._gnome_snapshot_ready.emit((gen, screen, slot, path, img))
 
-        ok = player.snapshot_to_file(path, width, height)
-        if not ok:
-            self._gnome_wallpaper_pending_tries += 1
-            if self._gnome_wallpaper_pending_tries <= 12:
-                QTimer.singleShot(350, self._tick_gnome_wallpaper)
-            else:
-                _log("GNOME wallpaper sync: no se pudo tomar snapshot (VLC sin frame)")
+        self._gnome_snapshot_busy = True
+        threading.Thread(target=_capture, name="komorebi-snapshot", daemon=True).start()
+
+    def _on_gnome_snapshot_ready(self, result: tuple) -> None:
+        gen, screen, slot, path, img = result
+        if gen != self._gnome_snapshot_gen or screen != self._gnome_wallpaper_source_screen:
+            self._gnome_snapshot_busy = False
+            return
+        if img is None:
+            self._gnome_snapshot_busy = False
+            _log("GNOME wallpaper sync: no se pudo tomar snapshot (VLC sin frame)")
+            return
+        try:
+            # QGraphicsScene/QPixmap: el blur tiene que ir en el hilo Qt.
+            blurred = _blur_image(img, 10.0)
+        except Exception as e:
+            self._gnome_snapshot_busy = False
+            _log(f"Error en snapshot: {e}")
             return
 
-        uri = path.resolve().as_uri()
-        ok_bg = _gsettings_set("picture-uri", uri)
-        ok_bg_dark = False
-        if _gsettings_has_key("org.gnome.desktop.background", "picture-uri-dark"):
-            ok_bg_dark = _gsettings_set("picture-uri-dark", uri)
+        # QImage.save (codificar el JPG) y os.replace valen en cualquier hilo.
+        def _encode():
+            ok = False
+            tmp_path = path.with_name(path.name + ".tmp")
+            try:
+                ok = blurred.save(str(tmp_path), "JPG", 90)
+                if ok:
+                    os.replace(tmp_path, path)
+            except OSError as e:
+                _log(f"GNOME wallpaper sync: error moviendo snapshot: {e}")
+                ok = False
+            except Exception as e:
+                _log(f"Error en snapshot: {e}")
+                ok = False
+            finally:
+                self._gnome_snapshot_saved.emit((gen, screen, slot, path, ok))
 
-        ok_ss = _gsettings_set_schema("org.gnome.desktop.screensaver", "picture-uri", uri)
-        ok_ss_dark = False
-        if _gsettings_has_key("org.gnome.desktop.screensaver", "picture-uri-dark"):
-            ok_ss_dark = _gsettings_set_schema("org.gnome.desktop.screensaver", "picture-uri-dark", _gsettings_quote(uri))
+        threading.Thread(target=_encode, name="komorebi-snapshot", daemon=True).start()
 
-        try:
-            now_uri = _gsettings_get("picture-uri")
-            _log(f"GNOME picture-uri actual: {now_uri}")
-        except Exception:
-            pass
+    def _on_gnome_snapshot_saved(self, result: tuple) -> None:
+        gen, screen, slot, path, ok = result
+        self._gnome_snapshot_busy = False
+        if gen != self._gnome_snapshot_gen or screen != self._gnome_wallpaper_source_screen:
+            return
+        if not ok:
+            _log("GNOME wallpaper sync: no se pudo guardar el snapshot")
+            return
 
-        if ok_bg or ok_bg_dark or ok_ss or ok_ss_dark:
+        # GNOME_WALLPAPER_DIR es absoluto: no hace falta resolve() (lstat por componente).
+        uri = path.as_uri()
+        bg_values = {"picture-uri": uri}
+        if self._has_bg_dark_key:
+            bg_values["picture-uri-dark"] = uri
+        ss_values = {"picture-uri": uri}
+        if self._has_ss_dark_key:
+            ss_values["picture-uri-dark"] = uri
+        # Un changeset por schema en lugar de cuatro escrituras sueltas.
+        ok_bg = _gsettings_set_many("org.gnome.desktop.background", bg_values)
+        ok_ss = _gsettings_set_many("org.gnome.desktop.screensaver", ss_values)
+
+        if _LOG_DEBUG:
+            _log_debug("GNOME picture-uri actual: %s", _gsettings_get("picture-uri"))
+
+        if ok_bg or ok_ss:
             self._force_gnome_background_refresh()
 
         self._gnome_wallpaper_last_uri = uri
         _log(f"GNOME wallpaper sync: actualizado -> {uri}")
 
-        cleanup_counter = getattr(self, "_cleanup_counter", 0) + 1
-        if cleanup_counter >= 10:
-            _cleanup_old_snapshots(GNOME_WALLPAPER_DIR, max_age_seconds=300)
-            cleanup_counter = 0
-        setattr(self, "_cleanup_counter", cleanup_counter)
-
-        try:
-            if self._gnome_wallpaper_current_path and self._gnome_wallpaper_current_path.exists():
-                self._gnome_wallpaper_current_path.unlink()
-        except Exception:
-            pass
+        self._gnome_wallpaper_slot = slot
+        self._gnome_wallpaper_paths.add(path)
         self._gnome_wallpaper_current_path = path
 
-    def _on_global_screen_change(self, geo):
-        _log("Cambio de geometría global detectado. Verificando players...")
-        for player in self.players.values():
-            player._check_screen_alive()
-
     def _on_screen_removed(self, screen):
         _log(f"➖ Pantalla desconectada: {screen.name()}")
         _xrandr_monitors(force_refresh=True)
-        self._monitor_layout_hash = self._compute_monitor_layout_hash()
+        self._monitor_layout_key = self._compute_monitor_layout_key()
         
+        name = screen.name()
         to_remove = []
-        for idx, player in list(self.players.items()):
-            if player.screen_name == screen.name():
-                to_remove.append(idx)
-            elif player.windowHandle() and player.windowHandle().screen() == screen:
+        for idx, player in self.players.items():
+            handle = player.windowHandle()
+            if player.screen_name == name or (handle and handle.screen() == screen):
                 to_remove.append(idx)
 
         for idx in to_remove:
@@ -1945,15 +2950,50 @@ class WallpaperService(QApplication):
 
     def _handle_new_connection(self):
         socket = self.server.nextPendingConnection()
-        socket.readyRead.connect(lambda: self._read_client_message(socket))
+        buf = bytearray()
+        socket.readyRead.connect(lambda: self._read_client_message(socket, buf))
         socket.disconnected.connect(socket.deleteLater)
 
-    def _read_client_message(self, socket):
+    def _read_client_message(self, socket, buf: bytearray):
+        # El engine mantiene la conexión abierta y termina cada mensaje con
+        # "\n"; un resto sin terminador es un cliente de un mensaje por conexión.
+        buf += socket.readAll().data()
+        *frames, rest = buf.split(b"\n")
+        del buf[:]
+        for frame in frames:
+            if frame:
+                self._dispatch_client_frame(frame)
+        if rest:
+            try:
+                cmd = self._parse_client_frame(rest)
+            except ValueError:
+                buf += rest  # JSON aún incompleto: espera al siguiente readyRead
+                return
+            self._run_client_command(cmd)
+
+    def _dispatch_client_frame(self, frame: bytes) -> None:
+        try:
+            cmd = self._parse_client_frame(frame)
+        except ValueError as e:
+            _log(f"Error leyendo mensaje: {e}")
+            return
+        self._run_client_command(cmd)
+
+    @staticmethod
+    def _parse_client_frame(frame: bytes) -> dict:
+        action = _IPC_OPCODES.get(bytes(frame)) if len(frame) == 1 else None
+        if action is not None:
+            return {"action": action}
+        # json.loads acepta bytes (UTF-8) directamente: sin str intermedio.
+        message = json.loads(bytes(frame))
+        if not isinstance(message, dict):
+            raise ValueError("mensaje IPC no es un objeto JSON")
+        _log(f"Mensaje recibido: {message}")
+        return message
+
+    def _run_client_command(self, cmd: dict) -> None:
         try:
-            data = socket.readAll().data()
-            message = json.loads(data.decode("utf-8"))
-            _log(f"Mensaje recibido: {message}")
-            self._process_command(message)
+            self._process_command(cmd)
         except Exception as e:
             _log(f"Error leyendo mensaje: {e}")
 
@@ -1988,7 +3028,7 @@ class WallpaperService(QApplication):
                         "paused": player.is_suspended or player._user_paused,
                         "volume": player.volume,
                         "video_path": player.video_path,
-                        "rate": getattr(player, "speed", 1.0),
+                        "rate": player.speed,
                     }
                     for idx, player in self.players.items()
                 }
@@ -2008,6 +3048,8 @@ class WallpaperService(QApplication):
         per_screen = cmd.get("per_screen")
         global_pause_on_max = cmd.get("pause_on_max", None)
 
+        rows: list[dict] = []
+
         def _apply(idx: int, payload: dict):
             player = self.players.get(idx)
             if not player:
@@ -2018,18 +3060,16 @@ class WallpaperService(QApplication):
                 pause_on_max=(global_pause_on_max if global_pause_on_max is not None else payload.get("pause_on_max", None)),
                 speed=payload.get("speed", None),
             )
-            try:
-                _upsert_monitor_config(
-                    screen_index=int(idx),
-                    screen_name=getattr(player, "screen_name", None),
-                    video_path=str(getattr(player, "video_path", "")),
-                    volume=int(getattr(player, "volume", 0)),
-                    pause_on_max=bool(getattr(player, "pause_on_max", False)),
-                    paused=bool(getattr(player, "paused", False)),
-                    speed=float(getattr(player, "speed", 1.0)),
-                )
-            except Exception:
-                pass
+            # Atributos fijados en BackgroundPlayer.__init__: acceso directo.
+            rows.append({
+                "screen_index": int(idx),
+                "screen_name": player.screen_name,
+                "video_path": str(player.video_path),
+                "volume": int(player.volume),
+                "pause_on_max": bool(player.pause_on_max),
+                "paused": bool(player.paused),
+                "speed": float(player.speed),
+            })
 
         if isinstance(per_screen, dict):
             for k, payload in per_screen.items():
@@ -2039,6 +3079,7 @@ class WallpaperService(QApplication):
                     continue
                 if isinstance(payload, dict):
                     _apply(idx, payload)
+            self._persist_update_rows(rows)
             return
 
         try:
@@ -2054,10 +3095,21 @@ class WallpaperService(QApplication):
         }
 
         if idx == -1:
-            for sidx in list(self.players.keys()):
+            for sidx in self.players:
                 _apply(int(sidx), payload)
         else:
             _apply(idx, payload)
+        self._persist_update_rows(rows)
+
+    @staticmethod
+    def _persist_update_rows(rows: list[dict]) -> None:
+        """Un único upsert para todas las pantallas tocadas por un `update`."""
+        if not rows:
+            return
+        try:
+            _upsert_monitor_configs(rows)
+        except Exception:
+            pass
 
     def _start_player(self, video_path, screen_index, pause_on_max, volume, paused, persist: bool = True):
         start_position = None
@@ -2086,6 +3138,7 @@ class WallpaperService(QApplication):
                 start_position=start_position,
             )
             self.players[screen_index] = player
+            player.playback_ready.connect(lambda idx=screen_index: self._on_player_playback_ready(idx))
             player.show()
 
             if persist:
@@ -2119,22 +3172,14 @@ class WallpaperService(QApplication):
                 except Exception:
                     pass
 
-                old_player.setWindowOpacity(1.0)
-                anim = QPropertyAnimation(old_player, b"windowOpacity")
-                anim.setDuration(250)
-                anim.setStartValue(1.0)
-                anim.setEndValue(0.0)
-                anim.setEasingCurve(QEasingCurve.InOutQuad)
-
-                def _after_fade():
-                    try:
-                        self._stop_player(screen_index, persist_disable=False)
-                    finally:
-                        _create_and_show()
-
-                anim.finished.connect(_after_fade)
-                anim.start()
-                setattr(old_player, "_swap_fade_anim", anim)
+                # Un fade reutilizable por pantalla. Si ya hay uno en curso (cambios
+                # rápidos), solo se sustituye lo que se crea al terminar.
+                self._swap_fade_pending[screen_index] = _create_and_show
+                anim = self._swap_fade_anim(screen_index)
+                if anim.state() != QPropertyAnimation.State.Running:
+                    old_player.setWindowOpacity(1.0)
+                    anim.setTargetObject(old_player)
+                    anim.start()
                 return
             except Exception:
                 self._stop_player(screen_index, persist_disable=False)
@@ -2143,6 +3188,28 @@ class WallpaperService(QApplication):
 
         _create_and_show()
 
+    def _swap_fade_anim(self, screen_index: int) -> QPropertyAnimation:
+        anim = self._swap_fade_anims.get(screen_index)
+        if anim is None:
+            anim = QPropertyAnimation(self)
+            anim.setPropertyName(b"windowOpacity")
+            anim.setDuration(250)
+            anim.setStartValue(1.0)
+            anim.setEndValue(0.0)
+            anim.setEasingCurve(QEasingCurve.InOutQuad)
+            anim.finished.connect(lambda idx=screen_index: self._on_swap_fade_finished(idx))
+            self._swap_fade_anims[screen_index] = anim
+        return anim
+
+    def _on_swap_fade_finished(self, screen_index: int) -> None:
+        self._swap_fade_anims[screen_index].setTargetObject(None)
+        create = self._swap_fade_pending.pop(screen_index, None)
+        try:
+            self._stop_player(screen_index, persist_disable=False)
+        finally:
+            if create is not None:
+                create()
+
     def _stop_player(self, screen_index, *, persist_disable: bool = True):
         if screen_index in self.players:
             _log(f"Deteniendo player en pantalla {screen_index}")
@@ -2168,9 +3235,11 @@ class WallpaperService(QApplication):
                 self._stop_gnome_wallpaper_sync(restore=True)
 
             try:
-                if player._vlc_player is not None:
-                    player._vlc_player.release()
-                    player._vlc_player = None
+                # Espera a un capture_frame en curso en el hilo de snapshots.
+                with player._snapshot_lock:
+                    if player._vlc_player is not None:
+                        player._vlc_player.release()
+                        player._vlc_player = None
             except Exception:
                 pass
 
@@ -2180,7 +3249,6 @@ class WallpaperService(QApplication):
                     player._vlc_media = None
             except Exception:
                 pass
-    gc.collect()
 
 
 def send_command_to_server(args):
@@ -2202,7 +3270,7 @@ def send_command_to_server(args):
                 "paused": args.paused,
             }
 
-        data = json.dumps(msg).encode("utf-8")
+        data = json.dumps(msg, separators=(",", ":")).encode("utf-8") + b"\n"
         socket.write(data)
         socket.flush()
         socket.waitForBytesWritten(1000)
@@ -4,41 +4,136 @@ Soporta Wayland y X11. Lanza un proceso de fondo sin barra ni icono.
 """
 import os
 import sys
+import signal
 import subprocess
 import json
 import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 from PySide6.QtGui import QGuiApplication
 from PySide6.QtNetwork import QLocalSocket
 
+try:
+    import orjson
+
+    # Serializa directo a bytes compactos (sin str intermedio).
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
 PID_DIR = Path("/tmp/komorebi_pids")
 LOG_FILE = Path("/tmp/komorebi_wall.log")
 THUMB_DIR = Path.home() / ".cache" / "komorebi" / "thumbnails"
 ROOT_DIR = Path(__file__).parent.parent.absolute()
 
+# Entorno de la sesión: no cambia durante la vida del proceso (ver refresh_env).
+_SESSION = os.environ.get('XDG_SESSION_TYPE', 'x11').lower()
+_DESKTOP_RAW = os.environ.get('XDG_CURRENT_DESKTOP', '')
+_IS_GNOME = 'GNOME' in _DESKTOP_RAW.upper()
+
 MIN_RATE = 0.25
 HARD_MAX_RATE = 2.5
 
 # Debe coincidir con SERVER_NAME en src/background_player.py
 WALLPAPER_SERVER_NAME = "komorebi_wallpaper_service"
+# Deben coincidir con IPC_OP_* en src/background_player.py
+IPC_OP_PING = b"\x01"
+IPC_OP_STATUS = b"\x02"
+
+THUMB_SIZE = 320
+THUMB_SEEK_TIME = b"00:00:05"
+# Tope de thumbnails generándose a la vez en get_thumbnails (CPU y disco).
+THUMB_MAX_WORKERS = min(os.cpu_count() or 1, 4)
+
+
+def _load_ffmpegthumbnailer():
+    """libffmpegthumbnailer vía ctypes (opcional); None si no está instalada."""
+    try:
+        import ctypes
+        import ctypes.util
+
+        name = ctypes.util.find_library("ffmpegthumbnailer") or "libffmpegthumbnailer.so.4"
+        lib = ctypes.CDLL(name)
+    except (OSError, ImportError):
+        return None
+
+    class _VideoThumbnailer(ctypes.Structure):
+        # Prefijo estable de `video_thumbnailer` (videothumbnailerc.h); el
+        # resto de campos solo los toca la librería.
+        _fields_ = [
+            ("thumbnail_size", ctypes.c_int),
+            ("seek_percentage", ctypes.c_int),
+            ("seek_time", ctypes.c_char_p),
+            ("overlay_film_strip", ctypes.c_int),
+            ("workaround_bugs", ctypes.c_int),
+            ("thumbnail_image_quality", ctypes.c_int),
+            ("thumbnail_image_type", ctypes.c_int),
+        ]
+
+    handle_t = ctypes.POINTER(_VideoThumbnailer)
+    lib.video_thumbnailer_create.restype = handle_t
+    lib.video_thumbnailer_create.argtypes = []
+    lib.video_thumbnailer_destroy.restype = None
+    lib.video_thumbnailer_destroy.argtypes = [handle_t]
+    lib.video_thumbnailer_generate_thumbnail_to_file.restype = ctypes.c_int
+    lib.video_thumbnailer_generate_thumbnail_to_file.argtypes = [handle_t, ctypes.c_char_p, ctypes.c_char_p]
+    return lib
 
 class WallpaperEngine:
     """Motor de reproducción de wallpapers animados"""
     
     def __init__(self):
         self.current_videos = {} # {screen_index: video_path}
+        # Procesos de fondo lanzados por este engine (ver _send_quit_command).
+        self._daemon_procs: set[subprocess.Popen] = set()
+        # Conexión persistente con el servicio (ver _send_payload_to_service).
+        self._svc_sock: QLocalSocket | None = None
+        # Último "update" enviado; play()/stop() lo invalidan (el servicio cambió).
+        self._last_update_payload: tuple | None = None
+        # Fondo estático de GNOME pendiente; un solo hilo aplica el último pedido.
+        self._gnome_bg_pending: str | None = None
+        self._gnome_bg_lock = threading.Lock()
+        self._gnome_bg_worker_running = False
+        # Gio.Settings de org.gnome.desktop.background; False = sin PyGObject.
+        self._bg_settings = None
         PID_DIR.mkdir(parents=True, exist_ok=True)
         THUMB_DIR.mkdir(parents=True, exist_ok=True)
 
-        self.session = os.environ.get('XDG_SESSION_TYPE', 'x11').lower()
-        self.is_gnome = 'GNOME' in os.environ.get('XDG_CURRENT_DESKTOP', '').upper()
+        # Handles libres de libffmpegthumbnailer: cada llamada toma uno en
+        # exclusiva (no admiten uso concurrente) y lo devuelve; como mucho se
+        # guardan THUMB_MAX_WORKERS, el resto se destruye. False = no disponible.
+        self._thumbnailer_lib = None
+        self._thumbnailer_free: list = []
+        self._thumbnailer_lock = threading.Lock()
+        # Los hilos del pool se crean al primer submit, no aquí.
+        self._thumb_pool = ThreadPoolExecutor(max_workers=THUMB_MAX_WORKERS, thread_name_prefix="komorebi-thumb")
+        # Generación en curso por video (ver get_thumbnail): una sola a la vez.
+        self._thumb_inflight: dict[str, Future] = {}
+        self._thumb_inflight_lock = threading.Lock()
+        # video_path -> ruta del thumbnail, y videos cuyo thumbnail ya existe:
+        # evitan el md5 y el stat en cada repintado (ver invalidate_thumbnail).
+        self._thumb_path_cache: dict[str, str] = {}
+        self._thumb_exists_cache: set[str] = set()
+
+        self.session = _SESSION
+        self.is_gnome = _IS_GNOME
         
         session_type = "Wayland" if self.session == "wayland" else "X11"
-        desktop = "GNOME" if self.is_gnome else os.environ.get('XDG_CURRENT_DESKTOP', 'Desconocido')
+        desktop = "GNOME" if self.is_gnome else (_DESKTOP_RAW or 'Desconocido')
         self._log(f"🖥️ Iniciando en {desktop} ({session_type})")
 
 
+    @classmethod
+    def refresh_env(cls):
+        """Vuelve a leer XDG_SESSION_TYPE/XDG_CURRENT_DESKTOP (afecta a los engines nuevos)."""
+        global _SESSION, _DESKTOP_RAW, _IS_GNOME
+        _SESSION = os.environ.get('XDG_SESSION_TYPE', 'x11').lower()
+        _DESKTOP_RAW = os.environ.get('XDG_CURRENT_DESKTOP', '')
+        _IS_GNOME = 'GNOME' in _DESKTOP_RAW.upper()
+
     def get_screen_count(self):
         """Retorna el número de pantallas detectadas"""
         if not QGuiApplication.instance():
@@ -51,6 +146,7 @@ class WallpaperEngine:
     
     def stop(self, screen_index=None):
         """Detiene la reproducción en una pantalla o en todas"""
+        self._last_update_payload = None
         if screen_index is not None:
             self._send_stop_command(screen_index)
             if screen_index in self.current_videos:
@@ -61,14 +157,36 @@ class WallpaperEngine:
     
     def play(self, video_path, screen_index=0, pause_on_max=False, volume=0, paused=False):
         """Reproduce un video como wallpaper en una pantalla específica"""
+        self._last_update_payload = None
         self.current_videos[screen_index] = video_path
         self._log(f"▶ Reproduciendo en pantalla {screen_index}: {os.path.basename(video_path)}")
 
-        if screen_index == 0:
-            self._set_gnome_background(video_path)
+        if screen_index == 0 and self.is_gnome:
+            self._queue_gnome_background(video_path)
         
         self._start_daemon(video_path, screen_index, pause_on_max, volume, paused)
 
+    def _queue_gnome_background(self, video_path: str) -> None:
+        """Aplica _set_gnome_background en un hilo, sin retrasar el play.
+
+        Si llegan varios seguidos (carrusel) solo se aplica el último.
+        """
+        with self._gnome_bg_lock:
+            self._gnome_bg_pending = video_path
+            if self._gnome_bg_worker_running:
+                return
+            self._gnome_bg_worker_running = True
+        threading.Thread(target=self._gnome_background_worker, name="komorebi-gnome-bg", daemon=True).start()
+
+    def _gnome_background_worker(self) -> None:
+        while True:
+            with self._gnome_bg_lock:
+                video_path, self._gnome_bg_pending = self._gnome_bg_pending, None
+                if video_path is None:
+                    self._gnome_bg_worker_running = False
+                    return
+            self._set_gnome_background(video_path)
+
     def _set_gnome_background(self, video_path: str) -> None:
         """Best-effort: setea un fondo estático en GNOME usando un thumbnail del video.
 
@@ -82,6 +200,8 @@ class WallpaperEngine:
             if not thumb or not os.path.exists(thumb):
                 return
             uri = Path(thumb).resolve().as_uri()
+            if self._set_gnome_background_gio(uri):
+                return
             subprocess.run(
                 ["gsettings", "set", "org.gnome.desktop.background", "picture-uri", uri],
                 stdout=subprocess.DEVNULL,
@@ -98,6 +218,39 @@ class WallpaperEngine:
         except Exception:
             return
 
+    def _set_gnome_background_gio(self, uri: str) -> bool:
+        """Escribe picture-uri(-dark) en proceso con GSettings; False si no hay PyGObject."""
+        settings = self._bg_settings
+        if settings is None:
+            try:
+                import gi
+
+                gi.require_version("Gio", "2.0")
+                from gi.repository import Gio
+
+                settings = Gio.Settings.new("org.gnome.desktop.background")
+            except Exception:
+                settings = False
+            self._bg_settings = settings
+        if not settings:
+            return False
+        try:
+            from gi.repository import Gio
+
+            # set_string con una clave inexistente aborta el proceso: -dark no
+            # existe en GNOME < 42.
+            has_dark = settings.props.settings_schema.has_key("picture-uri-dark")
+            settings.delay()
+            settings.set_string("picture-uri", uri)
+            if has_dark:
+                settings.set_string("picture-uri-dark", uri)
+            settings.apply()
+            # Este hilo no tiene main loop de GLib: vacía la escritura a dconf ya.
+            Gio.Settings.sync()
+            return True
+        except Exception:
+            return False
+
     def _background_player_base_cmd(self):
         """Construye el comando base para invocar el servicio de fondo.
 
@@ -110,6 +263,19 @@ class WallpaperEngine:
 
     def _start_daemon(self, video_path, screen_index, pause_on_max, volume, paused):
         """Lanza el proceso de fondo (o conecta al existente)"""
+        # El servicio ya vivo es el proceso "precalentado": un play por IPC
+        # ahorra arrancar un intérprete + PySide6 solo para reenviar el comando.
+        msg = {
+            "action": "play",
+            "video_path": video_path,
+            "screen": screen_index,
+            "pause_on_max": bool(pause_on_max),
+            "volume": volume,
+            "paused": bool(paused),
+        }
+        if self._send_command_to_service(msg):
+            return
+
         cmd = self._background_player_base_cmd() + [
             video_path,
             "--screen", str(screen_index),
@@ -121,29 +287,39 @@ class WallpaperEngine:
         if paused:
             cmd.append("--paused")
             
-        subprocess.Popen(
+        proc = subprocess.Popen(
                     cmd, 
                     cwd=str(ROOT_DIR), 
                     start_new_session=True, 
                     stdout=subprocess.DEVNULL, 
                     stderr=subprocess.DEVNULL
                 )
+        # Los clientes que solo reenviaron el comando ya terminaron: fuera del set.
+        self._daemon_procs = {p for p in self._daemon_procs if p.poll() is None}
+        self._daemon_procs.add(proc)
 
     def _send_stop_command(self, screen_index):
-        cmd = self._background_player_base_cmd() + [
-            "",  # Dummy path
-            "--screen", str(screen_index),
-            "--stop",
-        ]
-        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # Sin servicio no hay nada que detener (el cliente --stop tampoco lo arranca).
+        self._send_command_to_service({"action": "stop", "screen": screen_index})
 
     def _send_quit_command(self):
-        cmd = self._background_player_base_cmd() + [
-            "",  # Dummy path
-            "--quit-service",
-        ]
-        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        
+        self._send_command_to_service({"action": "quit"})
+
+        signaled = False
+        for proc in list(self._daemon_procs):
+            # poll() recoge a los que ya terminaron: su PID no se puede haber
+            # reutilizado mientras sea hijo sin recoger.
+            if proc.poll() is None:
+                try:
+                    os.kill(proc.pid, signal.SIGTERM)
+                    signaled = True
+                except ProcessLookupError:
+                    pass
+            self._daemon_procs.discard(proc)
+        if signaled:
+            return
+
+        # El servicio lo lanzó otra instancia de la GUI: no tenemos su PID.
         try:
             pattern = "src.background_player" if not getattr(sys, "frozen", False) else "--background-player"
             subprocess.run(["pkill", "-f", pattern], 
@@ -152,53 +328,196 @@ class WallpaperEngine:
             self._log(f"Error pkill: {e}")
 
     def get_thumbnail_path(self, video_path):
-        """Retorna la ruta esperada del thumbnail para un video"""
+        """Retorna la ruta esperada del thumbnail para un video.
+
+        WebP por defecto; si solo existe el .jpg (versiones anteriores o
+        libffmpegthumbnailer) se usa ese.
+        """
         if not video_path:
             return ""
 
-        h = hashlib.md5(video_path.encode()).hexdigest()
-        return str(THUMB_DIR / f"{h}.jpg")
+        thumb_path = self._thumb_path_cache.get(video_path)
+        if thumb_path is None:
+            key = video_path.encode()
+            # Solo nombra un fichero: BLAKE2b-128 basta y es más barato que MD5.
+            base = THUMB_DIR / hashlib.blake2b(key, digest_size=16).hexdigest()
+            thumb_path = f"{base}.webp"
+            if os.path.exists(thumb_path):
+                self._thumb_exists_cache.add(video_path)
+            else:
+                jpg_path = f"{base}.jpg"
+                self._migrate_md5_thumbnail(key, jpg_path)
+                if os.path.exists(jpg_path):
+                    thumb_path = jpg_path
+                    self._thumb_exists_cache.add(video_path)
+            self._thumb_path_cache[video_path] = thumb_path
+        return thumb_path
+
+    @staticmethod
+    def _migrate_md5_thumbnail(key: bytes, thumb_path: str) -> None:
+        """Renombra (una vez) el thumbnail con nombre MD5 de versiones anteriores."""
+        if os.path.exists(thumb_path):
+            return
+        old_path = str(THUMB_DIR / f"{hashlib.md5(key).hexdigest()}.jpg")
+        try:
+            os.rename(old_path, thumb_path)
+        except OSError:
+            pass
+
+    def invalidate_thumbnail(self, video_path):
+        """Olvida lo cacheado para `video_path` (video borrado o renombrado)."""
+        self._thumb_path_cache.pop(video_path, None)
+        self._thumb_exists_cache.discard(video_path)
 
     def get_thumbnail(self, video_path):
         """Genera y retorna la ruta del thumbnail"""
         thumb_path = self.get_thumbnail_path(video_path)
         if not thumb_path:
             return ""
-            
+
+        if video_path in self._thumb_exists_cache:
+            return thumb_path
         if os.path.exists(thumb_path):
+            self._thumb_exists_cache.add(video_path)
             return thumb_path
-            
+
+        # Un único generador por video (tarjetas, get_thumbnails, fondo GNOME):
+        # el resto espera a su resultado.
+        with self._thumb_inflight_lock:
+            fut = self._thumb_inflight.get(video_path)
+            owner = fut is None
+            if owner:
+                fut = self._thumb_inflight[video_path] = Future()
+        if not owner:
+            try:
+                return fut.result()
+            except Exception:
+                return ""
+
+        result = ""
         try:
-            subprocess.run([
-                "ffmpeg", "-y", "-ss", "00:00:05", "-i", video_path,
-                "-vframes", "1", "-q:v", "2", "-vf", "scale=320:-1",
-                thumb_path
-            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-            return thumb_path
-        except Exception as e:
-            self._log(f"Error generando thumbnail: {e}")
-            return ""
+            result = self._generate_thumbnail(video_path, thumb_path)
+        finally:
+            with self._thumb_inflight_lock:
+                self._thumb_inflight.pop(video_path, None)
+            fut.set_result(result)
+        return result
+
+    def _generate_thumbnail(self, video_path, thumb_path) -> str:
+        """Genera el thumbnail de `video_path`; "" si falló.
+
+        Se escribe a un nombre temporal y se mueve con os.replace: quien lo
+        lea nunca ve un fichero a medio escribir.
+        """
+        # libffmpegthumbnailer no codifica WebP: su thumbnail va como .jpg.
+        jpg_path = thumb_path.removesuffix(".webp") + ".jpg"
+        tmp_path = jpg_path + ".part"
+        if self._thumbnail_in_process(video_path, tmp_path):
+            try:
+                os.replace(tmp_path, jpg_path)
+                self._thumb_path_cache[video_path] = jpg_path
+                self._thumb_exists_cache.add(video_path)
+                return jpg_path
+            except OSError:
+                pass
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+        # WebP primero; un ffmpeg compilado sin libwebp cae al JPEG de siempre.
+        encoders = (
+            (thumb_path, ["-c:v", "libwebp", "-quality", "80", "-preset", "picture", "-f", "webp"]),
+            (jpg_path, ["-c:v", "mjpeg", "-q:v", "2", "-f", "image2"]),
+        )
+        for out_path, codec_args in encoders:
+            tmp_path = out_path + ".part"
+            try:
+                subprocess.run([
+                    "ffmpeg", "-y", "-threads", "0", "-ss", "00:00:05", "-i", video_path,
+                    "-vframes", "1", "-vf", f"scale={THUMB_SIZE}:-1",
+                    *codec_args, tmp_path
+                ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+                os.replace(tmp_path, out_path)
+                self._thumb_path_cache[video_path] = out_path
+                self._thumb_exists_cache.add(video_path)
+                return out_path
+            except Exception as e:
+                self._log(f"Error generando thumbnail: {e}")
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+        return ""
+
+    def get_thumbnails(self, video_paths) -> dict[str, str]:
+        """Como get_thumbnail para varios videos, generando los que faltan en paralelo.
+
+        Devuelve {video_path: thumb_path} ("" si falló).
+        """
+        result: dict[str, str] = {}
+        futures: dict[Future, str] = {}
+        for video_path in dict.fromkeys(video_paths):
+            thumb_path = self.get_thumbnail_path(video_path)
+            if not thumb_path or video_path in self._thumb_exists_cache or os.path.exists(thumb_path):
+                result[video_path] = thumb_path
+                continue
+            # get_thumbnail ya deduplica contra otros generadores del mismo video.
+            futures[self._thumb_pool.submit(self.get_thumbnail, video_path)] = video_path
+
+        for fut in as_completed(futures):
+            try:
+                result[futures[fut]] = fut.result()
+            except Exception:
+                result[futures[fut]] = ""
+        return result
+
+    def _thumbnail_in_process(self, video_path, thumb_path) -> bool:
+        """Genera el thumbnail con libffmpegthumbnailer, sin lanzar ffmpeg.
+
+        False si la librería no está o falla: el llamador usa el CLI.
+        """
+        lib = self._thumbnailer_lib
+        if lib is None:
+            lib = self._thumbnailer_lib = _load_ffmpegthumbnailer() or False
+        if not lib:
+            return False
+
+        with self._thumbnailer_lock:
+            handle = self._thumbnailer_free.pop() if self._thumbnailer_free else None
+        if handle is None:
+            handle = lib.video_thumbnailer_create()
+            if not handle:
+                return False
+            t = handle.contents
+            t.thumbnail_size = THUMB_SIZE
+            t.seek_time = THUMB_SEEK_TIME
+            t.thumbnail_image_type = 1  # Jpeg (enum ThumbnailerImageType)
+
+        try:
+            rc = lib.video_thumbnailer_generate_thumbnail_to_file(
+                handle, os.fsencode(video_path), os.fsencode(thumb_path)
+            )
+        except Exception:
+            rc = -1
+        finally:
+            with self._thumbnailer_lock:
+                keep = len(self._thumbnailer_free) < THUMB_MAX_WORKERS
+                if keep:
+                    self._thumbnailer_free.append(handle)
+            if not keep:
+                lib.video_thumbnailer_destroy(handle)
+        return rc == 0 and os.path.exists(thumb_path)
 
     def ping_service(self) -> bool:
         """Envía un ping al servicio para verificar que está vivo."""
-        return self._send_command_to_service({"action": "ping"})
+        return self._send_payload_to_service(IPC_OP_PING)
 
     def get_service_status(self) -> dict | None:
         """Obtiene el estado del servicio de wallpapers."""
-        try:
-            sock = QLocalSocket()
-            sock.connectToServer(WALLPAPER_SERVER_NAME)
-            if not sock.waitForConnected(300):
-                return None
-
-            payload = json.dumps({"action": "status"}).encode("utf-8")
-            sock.write(payload)
-            sock.flush()
-            sock.waitForBytesWritten(500)
-            sock.disconnectFromServer()
-            return {"service": "alive"}
-        except Exception:
+        if not self._send_payload_to_service(IPC_OP_STATUS):
             return None
+        return {"service": "alive"}
 
     def update_settings(self, config):
         """Actualiza la configuración de los wallpapers activos"""
@@ -220,26 +539,17 @@ class WallpaperEngine:
         if not isinstance(monitor_settings, dict):
             monitor_settings = {}
 
-        targets = set()
         wallpapers = config.get("wallpapers", {})
-        if isinstance(wallpapers, dict):
-            for k in wallpapers.keys():
-                try:
-                    targets.add(int(k))
-                except Exception:
-                    pass
-        for k in getattr(self, "current_videos", {}).keys():
-            try:
-                targets.add(int(k))
-            except Exception:
-                pass
+        if not isinstance(wallpapers, dict):
+            wallpapers = {}
 
+        targets = sorted(self._iter_targets(wallpapers, monitor_settings), key=lambda t: t[0])
         if not targets:
             return
 
         per_screen: dict[str, dict] = {}
-        for idx in sorted(targets):
-            ms = monitor_settings.get(str(idx), {})
+        key_rows = []
+        for idx, ms in targets:
             if not isinstance(ms, dict):
                 ms = {}
             vol = ms.get("volume", base_volume)
@@ -267,27 +577,77 @@ class WallpaperEngine:
                 "paused": paused_val,
                 "speed": speed,
             }
+            key_rows.append((idx, vol, paused_val, speed))
+
+        # Arrastrar un slider repite valores: sin cambios no se reenvía.
+        key = (pause_on_max, tuple(key_rows))
+        if key == self._last_update_payload:
+            return
 
         msg = {
             "action": "update",
             "pause_on_max": pause_on_max,
             "per_screen": per_screen,
         }
-        self._send_command_to_service(msg)
+        self._last_update_payload = key if self._send_command_to_service(msg) else None
+
+    def _iter_targets(self, wallpapers: dict, monitor_settings: dict):
+        """(índice, monitor_settings) de cada pantalla con wallpaper o video activo, sin repetir."""
+        seen = set()
+        for src in (wallpapers, self.current_videos):
+            for k in src:
+                try:
+                    idx = int(k)
+                except Exception:
+                    continue
+                if idx in seen:
+                    continue
+                seen.add(idx)
+                yield idx, monitor_settings.get(str(idx), {})
 
     def _send_command_to_service(self, msg: dict) -> bool:
         """Envía un comando JSON al servicio de wallpapers si está corriendo."""
+        return self._send_payload_to_service(_dumps(msg))
+
+    def _send_payload_to_service(self, payload: bytes) -> bool:
+        """Envía `payload` (JSON o un opcode IPC_OP_*) al servicio, terminado en "\n".
+
+        Reutiliza la conexión abierta; si se cayó (servicio reiniciado),
+        reconecta una vez.
+        """
+        frame = payload + b"\n"
+        for _ in range(2):
+            sock = self._ensure_connected()
+            if sock is None:
+                return False
+            try:
+                if sock.write(frame) == len(frame) and sock.waitForBytesWritten(500):
+                    return True
+            except Exception:
+                pass
+            self._drop_service_socket()
+        return False
+
+    def _ensure_connected(self) -> QLocalSocket | None:
+        sock = self._svc_sock
+        if sock is not None and sock.state() == QLocalSocket.LocalSocketState.ConnectedState:
+            return sock
+        self._drop_service_socket()
         try:
             sock = QLocalSocket()
             sock.connectToServer(WALLPAPER_SERVER_NAME)
             if not sock.waitForConnected(300):
-                return False
-
-            payload = json.dumps(msg).encode("utf-8")
-            sock.write(payload)
-            sock.flush()
-            sock.waitForBytesWritten(500)
-            sock.disconnectFromServer()
-            return True
+                sock.abort()
+                return None
         except Exception:
-            return False
+            return None
+        self._svc_sock = sock
+        return sock
+
+    def _drop_service_socket(self) -> None:
+        sock, self._svc_sock = self._svc_sock, None
+        if sock is not None:
+            try:
+                sock.abort()
+            except Exception:
+                pass
@@ -306,8 +306,6 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
 
-        QApplication.setStyle("Fusion")
-        
         self.setWindowTitle("Komorebi")
         self.resize(1100, 750) # Aumentado para mejor visualización
         self.setMinimumSize(900, 650)
@@ -317,6 +315,22 @@ class MainWindow(QMainWindow):
         self._resize_timer.setSingleShot(True)
         self._resize_timer.timeout.connect(self.rearrange_grid)
 
+        self._initialized = False
+
+    def initialize(self):
+        """Construye la UI completa, carga config y restaura wallpapers.
+
+        Se llama desde el event loop (QTimer.singleShot) para que la ventana
+        se pinte antes de hacer el trabajo pesado.
+        """
+        if self._initialized:
+            return
+        self._initialized = True
+
+        # El plugin de estilo se carga aquí, antes de crear los widgets y
+        # después del primer paint de la ventana vacía.
+        QApplication.setStyle("Fusion")
+
         icon_path = self._get_resource_path("icons/Komorebi.png")
         if os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
@@ -544,7 +558,8 @@ class MainWindow(QMainWindow):
         self.tray_icon.show()
 
     def closeEvent(self, event):
-        if self.tray_icon.isVisible():
+        tray_icon = getattr(self, "tray_icon", None)
+        if tray_icon is not None and tray_icon.isVisible():
             QMessageBox.information(self, "Komorebi", 
                                   "La aplicación seguirá ejecutándose en la bandeja del sistema.\nPara cerrar completamente, usa la opción 'Salir' del icono.")
             self.hide()
@@ -677,6 +692,7 @@ class MainWindow(QMainWindow):
                 return
             try:
                 os.rename(path, new_path)
+                self.engine.invalidate_thumbnail(path)
                 self._rewrite_wallpaper_paths(path, new_path)
                 self.refresh_grid()
                 self.restore_wallpapers()
@@ -691,6 +707,7 @@ class MainWindow(QMainWindow):
             try:
                 self._stop_wallpapers_using_path(path)
                 os.remove(path)
+                self.engine.invalidate_thumbnail(path)
                 self._remove_wallpaper_references(path)
                 self.refresh_grid()
             except Exception as e:
@@ -1003,6 +1020,8 @@ class MainWindow(QMainWindow):
                 self.monitor_widgets[0].setChecked(True)
 
         wallpapers = self.config.get("wallpapers", {})
+        # Genera en paralelo los thumbnails que falten; los botones luego solo los leen.
+        self.engine.get_thumbnails(p for p in wallpapers.values() if p and isinstance(p, str))
         for screen_str, video_path in wallpapers.items():
             try:
                 idx = int(screen_str)